@@ -1,98 +1,508 @@
+import os
 import re
+import sys
+import json
+import math
+import time
+import heapq
+import random
+import zlib
+import mmap
+import struct
+import codecs
+import asyncio
+import contextlib
+import tracemalloc
+import functools
+import itertools
+import string
+import argparse
+import sqlite3
+import hashlib
+import tempfile
 import xml.etree.ElementTree as ET
+from xml.parsers import expat
 from io import StringIO
-import math
+from array import array
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for batch metrics and corpus statistics
+    np = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; only used to report peak memory
+    resource = None
+
+# Part of every render cache key; bump whenever the rendered output changes
+GENERATOR_VERSION = "1.1.0"
+
+# Size of the reads used to copy spooled sections into a streamed report
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Characters of text split at a time by token_counts
+TOKEN_WINDOW_SIZE = 64 * 1024
+
+# Per-paper counts from which every numeric metric can be derived, see batch_metrics
+RAW_COUNT_FIELDS = ("abstract_word_count", "content_word_count", "total_characters",
+                    "abstract_sentences", "content_sentences", "keyword_count")
+
+# Metrics returned by perform_calculations, see MetricRegistry
+CALCULATION_METRICS = ("abstract_word_count", "content_word_count", "total_word_count", "abstract_content_ratio",
+                       "total_characters", "avg_word_length", "abstract_sentences", "content_sentences",
+                       "total_sentences", "avg_sentence_length", "reading_time", "keyword", "keyword_count",
+                       "keyword_density", "normalized_word_count", "normalized_avg_sentence",
+                       "normalized_abstract_ratio", "complexity_score")
+
+# Intermediate values shown in the calculation steps of the detailed report
+REPORT_METRICS = ("abstract_content_fraction", "keyword_fraction", "weighted_word_count", "weighted_avg_sentence",
+                  "weighted_abstract_ratio")
+
+# Metrics summarised by corpus_statistics
+CORPUS_METRICS = ("total_word_count", "abstract_content_ratio", "avg_word_length",
+                  "avg_sentence_length", "reading_time", "keyword_density", "complexity_score")
+
+# Default templates, see TemplateSet
+DETAILED_REPORT_TEMPLATE = (
+    "### Paper: {title}\n\n"
+    "#### Input Data:\n"
+    "- **Paper Title:** {title}\n"
+    "- **Authors:** {authors}\n"
+    "- **Abstract:**  \n"
+    "  {abstract}\n"
+    "- **Content:**  \n"
+    "  {content}\n"
+    "- **Author Biography:**  \n"
+    "  {biography}\n\n"
+    "---\n\n"
+    "#### Detailed Calculations:\n\n"
+    # 1. Word Count Calculation
+    "1. **Word Count Calculation:**\n"
+    " - **Formula:** $ \\text{{Word Count}} = \\text{{words in abstract}} + \\text{{words in content}} $\n"
+    " - **Steps:**\n"
+    "   - Count the number of words in the abstract: {abstract_word_count}\n"
+    "   - Count the number of words in the content: {content_word_count}\n"
+    "   - Add both counts together: {abstract_word_count} + {content_word_count} = {total_word_count}\n"
+    " - **Final Word Count:** **{total_word_count:.2f}**\n\n"
+    # 2. Abstract to Content Ratio
+    "2. **Abstract to Content Ratio Calculation:**\n"
+    " - **Formula:** $ \\text{{Abstract to Content Ratio}} = \\left(\\frac{{\\text{{words in abstract}}}}{{\\text{{words in content}}}}\\right) \\times 100 $\n"
+    " - **Steps:**\n"
+    "   - Divide the abstract word count by the content word count: {abstract_word_count} ÷ {content_word_count} = {abstract_content_fraction:.4f}\n"
+    "   - Multiply the result by 100: {abstract_content_fraction:.4f} × 100 = {abstract_content_ratio:.2f}%\n"
+    " - **Final Ratio:** **{abstract_content_ratio:.2f}%**\n\n"
+    # 3. Average Word Length
+    "3. **Average Word Length Calculation:**\n"
+    " - **Formula:** $ \\text{{Average Word Length}} = \\frac{{\\text{{Total Characters (excluding spaces)}}}}{{\\text{{Total Word Count}}}} $\n"
+    " - **Steps:**\n"
+    "   - Count all characters in the abstract and content, excluding spaces: {total_characters}\n"
+    "   - Divide the total number of characters by the total word count: {total_characters} ÷ {total_word_count} = {avg_word_length:.4f}\n"
+    " - **Final Average Word Length:** **{avg_word_length:.2f} characters**\n\n"
+    # 4. Sentence Count
+    "4. **Sentence Count Calculation:**\n"
+    " - **Formula:** $ \\text{{Total Sentences}} = \\text{{Sentences in abstract}} + \\text{{Sentences in content}} $\n"
+    " - **Steps:**\n"
+    "   - Identify and count the number of sentences in the abstract: {abstract_sentences}\n"
+    "   - Identify and count the number of sentences in the content: {content_sentences}\n"
+    "   - Add both counts together: {abstract_sentences} + {content_sentences} = {total_sentences}\n"
+    " - **Final Sentence Count:** **{total_sentences}**\n\n"
+    # 5. Average Sentence Length
+    "5. **Average Sentence Length Calculation:**\n"
+    " - **Formula:** $ \\text{{Average Sentence Length}} = \\frac{{\\text{{Word Count}}}}{{\\text{{Total Sentences}}}} $\n"
+    " - **Steps:**\n"
+    "   - Use the total word count from the Word Count Calculation: {total_word_count}\n"
+    "   - Divide the total word count by the total number of sentences: {total_word_count} ÷ {total_sentences} = {avg_sentence_length:.4f}\n"
+    " - **Final Average Sentence Length:** **{avg_sentence_length:.2f} words per sentence**\n\n"
+    # 6. Reading Time Estimation
+    "6. **Reading Time Estimation:**\n"
+    " - **Formula:** $ \\text{{Estimated Reading Time (minutes)}} = \\frac{{\\text{{Word Count}}}}{{200}} $\n"
+    " - **Steps:**\n"
+    "   - Assume an average reading speed of 200 words per minute.\n"
+    "   - Divide the total word count by 200: {total_word_count} ÷ 200 = {reading_time:.4f}\n"
+    " - **Final Estimated Reading Time:** **{reading_time:.2f} minutes**\n\n"
+    # 7. Keyword Density
+    "7. **Keyword Density Calculation:**\n"
+    " - **Formula:** $ \\text{{Keyword Density (\\%)}} = \\left(\\frac{{\\text{{Keyword Occurrences}}}}{{\\text{{Word Count}}}}\\right) \\times 100 $\n"
+    " - **Steps:**\n"
+    "   - Most frequent keyword identified: '{keyword}'\n"
+    "   - Count the number of times the keyword appears in the content: {keyword_count}\n"
+    "   - Divide the keyword occurrence count by the total word count: {keyword_count} ÷ {total_word_count} = {keyword_fraction:.4f}\n"
+    "   - Multiply the result by 100: {keyword_fraction:.4f} × 100 = {keyword_density:.2f}%\n"
+    " - **Final Keyword Density:** **{keyword_density:.2f}%**\n\n"
+    # 8. Complexity Score
+    "8. **Complexity Score Calculation:**\n"
+    " - **Formula:**  \n"
+    " $$ \\text{{Complexity Score}} = \\left(\\frac{{\\text{{Word Count}}}}{{1000}} \\times 0.3\\right) + \\left(\\frac{{\\text{{Average Sentence Length}}}}{{20}} \\times 0.4\\right) + \\left(\\frac{{\\text{{Abstract to Content Ratio}}}}{{20}} \\times 0.3\\right) $$\n"
+    " - **Steps:**\n"
+    "   - Normalize the Word Count by dividing it by 1000: {total_word_count} ÷ 1000 = {normalized_word_count:.4f}\n"
+    "   - Normalize the Average Sentence Length by dividing it by 20: {avg_sentence_length:.2f} ÷ 20 = {normalized_avg_sentence:.4f}\n"
+    "   - Normalize the Abstract to Content Ratio by dividing it by 20: {abstract_content_ratio:.2f} ÷ 20 = {normalized_abstract_ratio:.4f}\n"
+    "   - Multiply the normalized Word Count by 0.3: {normalized_word_count:.4f} × 0.3 = {weighted_word_count:.4f}\n"
+    "   - Multiply the normalized Average Sentence Length by 0.4: {normalized_avg_sentence:.4f} × 0.4 = {weighted_avg_sentence:.4f}\n"
+    "   - Multiply the normalized Abstract to Content Ratio by 0.3: {normalized_abstract_ratio:.4f} × 0.3 = {weighted_abstract_ratio:.4f}\n"
+    "   - Sum all three products: {weighted_word_count:.4f} + {weighted_avg_sentence:.4f} + {weighted_abstract_ratio:.4f} = {complexity_score:.4f}\n"
+    " - **Final Complexity Score:** **{complexity_score:.2f}**\n\n"
+)
+
+LATEX_DOCUMENT_TEMPLATE = (
+    "## LaTeX Document Generation\n\n"
+    # Title Page
+    "- **Title Page:**  \n"
+    "  ```latex\n"
+    "  \\documentclass{{article}}\n"
+    "  \\title{{{title}}}\n"
+    "  \\author{{{latex_authors}}}\n"
+    "  \\date{{\\today}}\n"
+    "  \\begin{{document}}\n"
+    "  \\maketitle\n"
+    "  ```\n\n"
+    # Abstract Section
+    "- **Abstract Section:**  \n"
+    "  ```latex\n"
+    "  \\begin{{abstract}}\n"
+    "  {abstract}\n"
+    "  \\end{{abstract}}\n"
+    "  ```\n\n"
+    # Main Content Section
+    "- **Main Content Section:**  \n"
+    "  ```latex\n"
+    "  \\section{{Introduction}}\n"
+    "{body}"
+    "  ```\n\n"
+    # Author Biography Section
+    "- **Author Biography Section:**  \n"
+    "  ```latex\n"
+    "  \\section{{Author Biography}}\n"
+    "  {biography}\n\n"
+    "  \\end{{document}}\n"
+    "  ```\n\n"
+)
+
+LATEX_INTRODUCTION_TEMPLATE = "  {paragraph}\n\n"
+
+LATEX_SECTION_TEMPLATE = (
+    "  \\section{{Section {index}}}\n"
+    "  {paragraph}\n\n"
+)
+
+# Standalone .tex project: one file per paper, \input by a master proceedings file
+TEX_PAPER_TEMPLATE = (
+    "% Paper {number}: {title}\n"
+    "\\clearpage\n"
+    "\\section{{{title}}}\n"
+    "\\begin{{center}}\n"
+    "{authors}\n"
+    "\\end{{center}}\n\n"
+    "\\begin{{abstract}}\n"
+    "{abstract}\n"
+    "\\end{{abstract}}\n\n"
+    "\\subsection{{Introduction}}\n"
+    "{body}"
+    "\\subsection*{{Author Biography}}\n"
+    "{biography}\n"
+)
 
-def validate_xml_data(xml_string):
-    """Validate XML data structure and content."""
+TEX_INTRODUCTION_TEMPLATE = "{paragraph}\n\n"
+
+TEX_SECTION_TEMPLATE = (
+    "\\subsection{{Section {index}}}\n"
+    "{paragraph}\n\n"
+)
+
+TEX_PROCEEDINGS_TEMPLATE = (
+    "\\documentclass{{article}}\n"
+    "\\title{{{title}}}\n"
+    "\\date{{\\today}}\n"
+    "\\begin{{document}}\n"
+    "\\maketitle\n"
+    "\\tableofcontents\n\n"
+    "{inputs}\n"
+    "\\end{{document}}\n"
+)
+
+DEFAULT_TEMPLATE_SOURCES = {
+    "detailed_report": DETAILED_REPORT_TEMPLATE,
+    "latex_document": LATEX_DOCUMENT_TEMPLATE,
+    "latex_introduction": LATEX_INTRODUCTION_TEMPLATE,
+    "latex_section": LATEX_SECTION_TEMPLATE,
+    "tex_paper": TEX_PAPER_TEMPLATE,
+    "tex_introduction": TEX_INTRODUCTION_TEMPLATE,
+    "tex_section": TEX_SECTION_TEMPLATE,
+    "tex_proceedings": TEX_PROCEEDINGS_TEMPLATE
+}
+
+# Compiled TemplateSets by their sources, see template_set
+COMPILED_TEMPLATE_SETS = {}
+
+# Words ignored when picking the most frequent keyword of a paper
+STOPWORDS = frozenset({'the', 'and', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+
+WORD_PATTERN = re.compile(r'\w+')
+WHITESPACE_PATTERN = re.compile(r'\s')
+
+# LaTeX text-mode escapes for the characters that break compilation, see escape_latex
+LATEX_ESCAPES = {
+    '\\': '\\textbackslash{}',
+    '{': '\\{',
+    '}': '\\}',
+    '&': '\\&',
+    '%': '\\%',
+    '$': '\\$',
+    '#': '\\#',
+    '_': '\\_',
+    '~': '\\textasciitilde{}',
+    '^': '\\textasciicircum{}',
+    '<': '\\textless{}',
+    '>': '\\textgreater{}'
+}
+
+LATEX_SPECIAL_PATTERN = re.compile(f"([{re.escape(''.join(LATEX_ESCAPES))}])")
+
+# Math passed through unescaped when it is trusted: $$...$$, $...$, \(...\) and \[...\]
+LATEX_MATH_PATTERN = re.compile(r'(\$\$.+?\$\$|\$[^$]+?\$|\\\(.+?\\\)|\\\[.+?\\\])', re.DOTALL)
+
+def new_validation_report():
+    """Create an empty validation report to be filled in paper by paper."""
+    return {
+        "total_papers": 0,
+        "valid": True,
+        "errors": [],
+        "field_validity": {
+            "paper_title": True,
+            "authors": True,
+            "abstract": True,
+            "content": True,
+            "author_biography": True
+        },
+        "papers": []
+    }
+
+def format_position(position):
+    """Format a (line, column) source position, whose column is 0-based as in ET.ParseError."""
+    line, column = position
+    return f"line {line}, column {column + 1}"
+
+def invalid_format_report(error=None):
+    """Validation report for input that is not well-formed XML, saying where when the ET.ParseError is given."""
+    if error is None:
+        message = "ERROR: Invalid data format. Please provide data in XML format enclosed in a markdown block."
+    else:
+        reason = str(error).split(":")[0]
+        message = (f"ERROR: Invalid data format ({reason} at {format_position(error.position)}). "
+                   "Please provide data in XML format enclosed in a markdown block.")
+    return {
+        "valid": False,
+        "errors": [message],
+        "field_validity": {
+            "paper_title": False,
+            "authors": False,
+            "abstract": False,
+            "content": False,
+            "author_biography": False
+        },
+        "total_papers": 0
+    }
+
+class PaperRecord(namedtuple("PaperRecord", "title authors abstract content biography")):
+    """The fields of one paper as a plain tuple, extracted once during validation so it pickles cheaply."""
+    
+    __slots__ = ()
+
+REQUIRED_FIELDS = ('paper_title', 'authors', 'abstract', 'content', 'author_biography')
+
+def validate_paper(paper, validation_report, position=None):
+    """Validate a paper element into the validation report, returning its PaperRecord or None when invalid."""
+    paper_id = f"Paper {validation_report['total_papers'] + 1}"
+    validation_report["total_papers"] += 1
+    paper_data = {"id": paper_id, "errors": []}
+    if position is not None:
+        paper_data["line"], paper_data["column"] = position[0], position[1] + 1
+        paper_id += f" ({format_position(position)})"
+    
+    # Look up every child once, keeping the first of each tag like find() does
+    children = {child.tag: child for child in reversed(paper)}
+    
+    # Check required fields
+    missing_fields = []
+    empty_fields = []
+    author_names = []
+    
+    for field in REQUIRED_FIELDS:
+        element = children.get(field)
+        if field != 'authors':
+            if element is None:
+                missing_fields.append(field)
+                validation_report["field_validity"][field] = False
+            elif element.text is None or element.text.strip() == "":
+                empty_fields.append(field)
+                validation_report["field_validity"][field] = False
+        else:
+            if element is None:
+                missing_fields.append(field)
+                validation_report["field_validity"][field] = False
+            else:
+                author_elements = element.findall('author')
+                author_names = [author.text for author in author_elements if author.text]
+                if not author_elements:
+                    missing_fields.append('author')
+                    validation_report["field_validity"][field] = False
+                else:
+                    has_valid_author = False
+                    for name in author_names:
+                        if name.strip():
+                            has_valid_author = True
+                            break
+                    if not has_valid_author:
+                        empty_fields.append(field)
+                        validation_report["field_validity"][field] = False
+    
+    # Record errors
+    if missing_fields:
+        error_msg = f"ERROR: Missing required tag(s): {', '.join(missing_fields)} in {paper_id}."
+        paper_data["errors"].append(error_msg)
+        validation_report["errors"].append(error_msg)
+        validation_report["valid"] = False
+    
+    if empty_fields:
+        error_msg = f"ERROR: Empty content in required tag(s): {', '.join(empty_fields)} in {paper_id}."
+        paper_data["errors"].append(error_msg)
+        validation_report["errors"].append(error_msg)
+        validation_report["valid"] = False
+    
+    validation_report["papers"].append(paper_data)
+    if paper_data["errors"]:
+        return None
+    return PaperRecord._make((children['paper_title'].text, tuple(author_names), children['abstract'].text,
+                              children['content'].text, children['author_biography'].text))
+
+def validate_xml_data(xml_string, profiler=None, max_errors=None, positions=False, duplicates=None):
+    """Validate XML data, returning the validation report and the records of the valid papers, or None."""
+    if profiler is not None:
+        profiler.bytes_parsed += len(xml_string) if isinstance(xml_string, bytes) else len(xml_string.encode('utf-8'))
+    if max_errors is not None or positions:
+        return validate_xml_source(xml_string, profiler, max_errors, duplicates)
+    
     try:
         # Parse XML string
-        root = ET.fromstring(xml_string)
-        
-        validation_report = {
-            "total_papers": 0,
-            "valid": True,
-            "errors": [],
-            "field_validity": {
-                "paper_title": True,
-                "authors": True,
-                "abstract": True,
-                "content": True,
-                "author_biography": True
-            },
-            "papers": []
-        }
+        if profiler is None:
+            root = ET.fromstring(xml_string)
+        else:
+            with profiler.stage("parse"):
+                root = ET.fromstring(xml_string)
+        
+        validation_report = new_validation_report()
         
         # Validate each paper
-        for i, paper in enumerate(root.findall('paper')):
-            paper_id = f"Paper {i+1}"
-            validation_report["total_papers"] += 1
-            paper_data = {"id": paper_id, "errors": []}
-            
-            # Check required fields
-            required_fields = ['paper_title', 'authors', 'abstract', 'content', 'author_biography']
-            missing_fields = []
-            empty_fields = []
-            
-            for field in required_fields:
-                if field != 'authors':
-                    element = paper.find(field)
-                    if element is None:
-                        missing_fields.append(field)
-                        validation_report["field_validity"][field] = False
-                    elif element.text is None or element.text.strip() == "":
-                        empty_fields.append(field)
-                        validation_report["field_validity"][field] = False
-                else:
-                    authors = paper.find('authors')
-                    if authors is None:
-                        missing_fields.append(field)
-                        validation_report["field_validity"][field] = False
-                    else:
-                        author_elements = authors.findall('author')
-                        if not author_elements:
-                            missing_fields.append('author')
-                            validation_report["field_validity"][field] = False
-                        else:
-                            has_valid_author = False
-                            for author in author_elements:
-                                if author.text and author.text.strip():
-                                    has_valid_author = True
-                                    break
-                            if not has_valid_author:
-                                empty_fields.append(field)
-                                validation_report["field_validity"][field] = False
-            
-            # Record errors
-            if missing_fields:
-                error_msg = f"ERROR: Missing required tag(s): {', '.join(missing_fields)} in {paper_id}."
-                paper_data["errors"].append(error_msg)
-                validation_report["errors"].append(error_msg)
-                validation_report["valid"] = False
-            
-            if empty_fields:
-                error_msg = f"ERROR: Empty content in required tag(s): {', '.join(empty_fields)} in {paper_id}."
-                paper_data["errors"].append(error_msg)
-                validation_report["errors"].append(error_msg)
-                validation_report["valid"] = False
-            
-            validation_report["papers"].append(paper_data)
+        with profiler.stage("validate") if profiler is not None else contextlib.nullcontext():
+            records = [validate_paper(paper, validation_report) for paper in root.findall('paper')]
+        
+        if duplicates is not None:
+            for number, record in enumerate(records, 1):
+                if record is not None:
+                    duplicates.add(record.content, number)
+            validation_report["near_duplicates"] = duplicates.pairs()
         
-        return validation_report, root
+        if len(root) == 0:
+            return validation_report, None
+        return validation_report, [record for record in records if record is not None]
     
     except ET.ParseError:
-        return {
-            "valid": False,
-            "errors": ["ERROR: Invalid data format. Please provide data in XML format enclosed in a markdown block."],
-            "field_validity": {
-                "paper_title": False,
-                "authors": False,
-                "abstract": False,
-                "content": False,
-                "author_biography": False
-            },
-            "total_papers": 0
-        }, None
+        return invalid_format_report(), None
+
+def stop_validation(validation_report, invalid_papers):
+    """Note in the validation report that validation stopped at the error limit."""
+    validation_report["errors"].append(f"ERROR: Validation stopped after {invalid_papers} invalid paper(s); "
+                                       "later papers were not checked.")
+
+def validate_xml_source(source, profiler=None, max_errors=None, duplicates=None):
+    """Validate XML data or a file-like object incrementally, with source positions and an optional error limit."""
+    validation_report = new_validation_report()
+    has_children = False
+    
+    def root_children():
+        nonlocal has_children
+        for child in iter_source_children(source, True, profiler):
+            has_children = True
+            yield child
+    
+    try:
+        records = list(iter_valid_records(root_children(), validation_report, max_errors, profiler, duplicates,
+                                          every_valid=True))
+    except ET.ParseError as error:
+        return invalid_format_report(error), None
+    return validation_report, records if has_children else None
+
+def iter_root_children(source):
+    """Incrementally parse an XML file or file-like object, yielding each child of the root as it closes."""
+    root = None
+    depth = 0
+    for event, element in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            yield element
+            # Drop the finished child (and anything before it) from the partial tree
+            root.clear()
+
+def iter_positioned_children(source):
+    """Incrementally parse XML data or a file-like object, yielding (child, (line, column)) per root child."""
+    parser = expat.ParserCreate(namespace_separator="}")
+    builder = ET.TreeBuilder()
+    root = None
+    depth = 0
+    starts = []
+    finished = []
+    
+    def qualified(name):
+        # Namespaced tags and attributes are spelled {uri}name, as in ElementTree
+        return "{" + name if "}" in name else name
+    
+    def start(tag, attributes):
+        nonlocal root, depth
+        depth += 1
+        if depth == 2:
+            starts.append((parser.CurrentLineNumber, parser.CurrentColumnNumber))
+        element = builder.start(qualified(tag), {qualified(name): value for name, value in attributes.items()})
+        if root is None:
+            root = element
+    
+    def end(tag):
+        nonlocal depth
+        element = builder.end(qualified(tag))
+        if depth == 2:
+            finished.append((element, starts.pop()))
+        depth -= 1
+    
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = builder.data
+    
+    if isinstance(source, (str, bytes)):
+        chunks = (source[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(source), STREAM_CHUNK_SIZE))
+    else:
+        chunks = iter(lambda: source.read(STREAM_CHUNK_SIZE), source.read(0))
+    
+    # An empty chunk after the input tells expat the document is complete
+    for data in itertools.chain(chunks, [b""]):
+        try:
+            parser.Parse(data, not data)
+        except expat.ExpatError as error:
+            parse_error = ET.ParseError(f"{expat.ErrorString(error.code)}: line {error.lineno}, column {error.offset}")
+            parse_error.code, parse_error.position = error.code, (error.lineno, error.offset)
+            raise parse_error from None
+        yield from finished
+        finished.clear()
+        # Drop the finished children from the partial tree
+        if root is not None:
+            root.clear()
 
 def count_words(text):
     """Count the number of words in a text."""
@@ -126,308 +536,2287 @@ def keyword_density(text, keyword):
     keyword_count = len(re.findall(r'\b' + re.escape(keyword) + r'\b', text, re.IGNORECASE))
     return (keyword_count / total_words) * 100
 
-def perform_calculations(paper_element):
-    """Perform all required calculations for a paper."""
-    abstract = paper_element.find('abstract').text
-    content = paper_element.find('content').text
+def text_statistics(text, count_terms=False, stopwords=STOPWORDS, min_term_length=3, tokens=None):
+    """Collect word, character, sentence and (with count_terms) term counts of a text from its tallied tokens."""
+    stats = {"words": 0, "characters": 0, "sentences": 0, "terms": None}
+    if not text:
+        if count_terms:
+            stats["terms"] = {}
+        return stats
+    if tokens is None:
+        tokens = token_counts(text)
+    
+    words = 0
+    characters = 0
+    separators = 0
+    lone_separator = False
+    terms = {}
+    
+    for token, occurrences in tokens.items():
+        characters += len(token) * occurrences
+        
+        # A token ending in . ! or ? is always followed by whitespace or the end of the text
+        if token[-1] in '.!?':
+            separators += occurrences
+            lone_separator = lone_separator or len(token) == 1
+        
+        # split_token's plain-word case, inlined because it covers most tokens of prose
+        word = token.rstrip('.,;:!?')
+        if word.isascii() and word.isalnum():
+            words += occurrences
+            if count_terms:
+                term = word.lower()
+                terms[term] = terms.get(term, 0) + occurrences
+            continue
+        token_words, token_terms = split_token(token, count_terms)
+        words += token_words * occurrences
+        if count_terms:
+            for term in token_terms:
+                terms[term] = terms.get(term, 0) + occurrences
+    
+    stats["words"] = words
+    stats["characters"] = characters
+    
+    if lone_separator:
+        # A stand-alone punctuation mark may close an empty sentence, which count_sentences skips
+        stats["sentences"] = count_sentences(text)
+    else:
+        ends_with_separator = text[-1] in '.!?' or (len(text) > 1 and text[-2] in '.!?' and text[-1].isspace())
+        stats["sentences"] = separators + (0 if ends_with_separator else 1)
+    
+    if count_terms:
+        stats["terms"] = select_terms(terms, stopwords, min_term_length)
+    
+    return stats
+
+def split_token(token, want_terms=True):
+    """Return the word count and the lowercased words of a whitespace-separated token, or None for the words."""
+    # Plain ASCII words, possibly followed by punctuation, hold exactly one word
+    word = token.rstrip('.,;:!?')
+    if word.isascii() and word.isalnum():
+        return 1, (word.lower(),) if want_terms else None
+    if not want_terms:
+        return len(WORD_PATTERN.findall(token)), None
+    return len(WORD_PATTERN.findall(token)), WORD_PATTERN.findall(token.lower())
+
+def token_counts(text):
+    """Tally the whitespace-separated tokens of a text, in order of first appearance."""
+    counts = Counter()
+    if not text:
+        return counts
+    start = 0
+    # Split one window at a time, so no list of every token is built
+    while start < len(text):
+        boundary = WHITESPACE_PATTERN.search(text, start + TOKEN_WINDOW_SIZE)
+        end = boundary.start() if boundary else len(text)
+        counts.update(text[start:end].split())
+        start = end
+    return counts
+
+def term_counts(tokens, stopwords=STOPWORDS, min_term_length=3):
+    """Count the lowercased non-stopword terms of tallied tokens, in order of first appearance."""
+    terms = {}
+    for token, occurrences in tokens.items():
+        for term in split_token(token)[1]:
+            terms[term] = terms.get(term, 0) + occurrences
+    return select_terms(terms, stopwords, min_term_length)
+
+def select_terms(terms, stopwords=STOPWORDS, min_term_length=3):
+    """Drop the stopwords and the words shorter than min_term_length from word counts."""
+    return {term: count for term, count in terms.items() if term not in stopwords and len(term) >= min_term_length}
+
+def word_tokens(text):
+    """Split a text into its lowercased words, in order, tokenizing exactly like text_statistics."""
+    return [word for token in text.split() for word in split_token(token)[1]]
+
+def paper_record(paper_element):
+    """Extract the PaperRecord of a paper element that is known to be valid."""
+    # Get authors
+    authors_element = paper_element.find('authors')
+    authors = []
+    for author_element in authors_element.findall('author'):
+        if author_element.text:
+            authors.append(author_element.text)
+    
+    return PaperRecord(paper_element.find('paper_title').text, tuple(authors), paper_element.find('abstract').text,
+                       paper_element.find('content').text, paper_element.find('author_biography').text)
+
+def paper_fields(paper):
+    """Return the fields of a paper given either its XML element or its record."""
+    if isinstance(paper, tuple):
+        return paper
+    return paper_record(paper)
+
+class MetricRegistry:
+    """Named per-paper metrics, each computed from the metrics it depends on."""
+    
+    def __init__(self, metrics=None, internal=()):
+        self.metrics = dict(metrics or {})
+        self.internal = set(internal)
+        self.plans = {}
+    
+    def register(self, name, function, dependencies=(), internal=False):
+        """Register a metric computed by function from the values of dependencies."""
+        if name in self.metrics or name in PaperRecord._fields:
+            raise ValueError(f"Metric {name} is already registered")
+        unknown = [dependency for dependency in dependencies
+                   if dependency not in self.metrics and dependency not in PaperRecord._fields]
+        if unknown:
+            raise ValueError(f"Metric {name} depends on unknown metric(s): {', '.join(unknown)}")
+        self.metrics[name] = (function, tuple(dependencies))
+        if internal:
+            self.internal.add(name)
+        self.plans.clear()
+    
+    def metric(self, name, dependencies=(), internal=False):
+        """Decorator form of register."""
+        def decorator(function):
+            self.register(name, function, dependencies, internal)
+            return function
+        return decorator
+    
+    def copy(self):
+        """Return a registry with the same metrics, to which more can be registered separately."""
+        return MetricRegistry(self.metrics, self.internal)
+    
+    def reportable(self):
+        """Return the names of the metrics that are not internal, in order of registration."""
+        return [name for name in self.metrics if name not in self.internal]
+    
+    def plan(self, names):
+        """Return the (name, function, dependencies) steps computing the named metrics, cached per set of names."""
+        names = tuple(names)
+        plan = self.plans.get(names)
+        if plan is None:
+            plan = []
+            planned = set(PaperRecord._fields)
+            
+            def visit(name):
+                if name in planned:
+                    return
+                function, dependencies = self.metrics[name]
+                for dependency in dependencies:
+                    visit(dependency)
+                planned.add(name)
+                plan.append((name, function, dependencies))
+            
+            for name in names:
+                visit(name)
+            plan = self.plans[names] = tuple(plan)
+        return plan
+    
+    def compute(self, paper, names, values=None):
+        """Compute the named metrics of a paper element or record, reusing any values already known."""
+        return PaperMetrics(self, paper, values).compute(names)
+
+class PaperMetrics:
+    """The metrics of one paper, each computed on first access and then kept."""
+    
+    __slots__ = ("registry", "values")
+    
+    def __init__(self, registry, paper, values=None):
+        self.registry = registry
+        self.values = dict(zip(PaperRecord._fields, paper_fields(paper)))
+        if values:
+            self.values.update(values)
+    
+    def __getitem__(self, name):
+        try:
+            return self.values[name]
+        except KeyError:
+            pass
+        function, dependencies = self.registry.metrics[name]
+        value = self.values[name] = function(*[self[dependency] for dependency in dependencies])
+        return value
+    
+    def compute(self, names):
+        """Return the named metrics as a dict, following the registry's plan for them."""
+        values = self.values
+        for name, function, dependencies in self.registry.plan(names):
+            if name not in values:
+                values[name] = function(*[values[dependency] for dependency in dependencies])
+        return {name: values[name] for name in names}
+
+def default_metric_registry():
+    """Build a registry holding the metrics of perform_calculations and the detailed report."""
+    registry = MetricRegistry()
+    register = registry.register
+    
+    # Scan each field once for all of its counts, splitting the content tokens once for words and terms alike
+    register("abstract_tokens", token_counts, ("abstract",), internal=True)
+    register("content_tokens", token_counts, ("content",), internal=True)
+    register("abstract_stats", lambda abstract, tokens: text_statistics(abstract, tokens=tokens),
+             ("abstract", "abstract_tokens"), internal=True)
+    register("content_stats", lambda content, tokens: text_statistics(content, count_terms=True, tokens=tokens),
+             ("content", "content_tokens"), internal=True)
+    register("content_terms", lambda stats: stats["terms"], ("content_stats",), internal=True)
+    # Content counts without terms, for metrics that never need the keyword
+    register("content_counts", lambda content, tokens: text_statistics(content, tokens=tokens),
+             ("content", "content_tokens"), internal=True)
     
     # Word Count Calculation
-    abstract_word_count = count_words(abstract)
-    content_word_count = count_words(content)
-    total_word_count = abstract_word_count + content_word_count
+    register("abstract_word_count", lambda stats: stats["words"], ("abstract_stats",))
+    register("content_word_count", lambda stats: stats["words"], ("content_stats",))
+    register("total_word_count", lambda abstract, content: abstract + content,
+             ("abstract_word_count", "content_word_count"))
     
     # Abstract to Content Ratio
-    abstract_content_ratio = (abstract_word_count / content_word_count) * 100 if content_word_count > 0 else 0
+    register("abstract_content_fraction", lambda abstract, content: abstract / content if content > 0 else 0,
+             ("abstract_word_count", "content_word_count"))
+    register("abstract_content_ratio", lambda fraction: fraction * 100, ("abstract_content_fraction",))
     
     # Average Word Length
-    total_chars = count_characters_no_spaces(abstract + content)
-    avg_word_length = total_chars / total_word_count if total_word_count > 0 else 0
+    register("total_characters", lambda abstract, content: abstract["characters"] + content["characters"],
+             ("abstract_stats", "content_stats"))
+    register("avg_word_length", lambda characters, words: characters / words if words > 0 else 0,
+             ("total_characters", "total_word_count"))
     
     # Sentence Count
-    abstract_sentences = count_sentences(abstract)
-    content_sentences = count_sentences(content)
-    total_sentences = abstract_sentences + content_sentences
+    register("abstract_sentences", lambda stats: stats["sentences"], ("abstract_stats",))
+    register("content_sentences", lambda stats: stats["sentences"], ("content_stats",))
+    register("total_sentences", lambda abstract, content: abstract + content,
+             ("abstract_sentences", "content_sentences"))
     
     # Average Sentence Length
-    avg_sentence_length = total_word_count / total_sentences if total_sentences > 0 else 0
+    register("avg_sentence_length", lambda words, sentences: words / sentences if sentences > 0 else 0,
+             ("total_word_count", "total_sentences"))
     
     # Reading Time Estimation
-    reading_time = total_word_count / 200  # 200 words per minute
+    register("reading_time", lambda words: words / 200, ("total_word_count",))  # 200 words per minute
     
     # Keyword Density (using a simple approach - finding most frequent meaningful word)
-    words = re.findall(r'\b\w+\b', content.lower())
-    stopwords = {'the', 'and', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-    filtered_words = [word for word in words if word not in stopwords and len(word) > 2]
+    register("keyword", lambda terms: max(terms, key=terms.get) if terms else "", ("content_terms",))
+    register("keyword_count", lambda terms, keyword: terms[keyword] if terms else 0, ("content_terms", "keyword"))
+    register("keyword_fraction", lambda count, words: count / words if words > 0 else 0,
+             ("keyword_count", "total_word_count"))
+    register("keyword_density", lambda fraction: fraction * 100, ("keyword_fraction",))
     
-    keyword = ""
-    keyword_count = 0
-    if filtered_words:
-        word_counts = {}
-        for word in filtered_words:
-            if word in word_counts:
-                word_counts[word] += 1
+    # Complexity Score
+    register("normalized_word_count", lambda words: words / 1000, ("total_word_count",))
+    register("normalized_avg_sentence", lambda length: length / 20, ("avg_sentence_length",))
+    register("normalized_abstract_ratio", lambda ratio: ratio / 20, ("abstract_content_ratio",))
+    register("weighted_word_count", lambda normalized: normalized * 0.3, ("normalized_word_count",))
+    register("weighted_avg_sentence", lambda normalized: normalized * 0.4, ("normalized_avg_sentence",))
+    register("weighted_abstract_ratio", lambda normalized: normalized * 0.3, ("normalized_abstract_ratio",))
+    register("complexity_score", lambda words, sentence, ratio: words + sentence + ratio,
+             ("weighted_word_count", "weighted_avg_sentence", "weighted_abstract_ratio"))
+    return registry
+
+METRICS = default_metric_registry()
+
+def compute_metrics(paper, names, registry=None):
+    """Compute only the named metrics of a paper element or record, and what they depend on."""
+    return (registry or METRICS).compute(paper, names)
+
+def perform_calculations(paper_element):
+    """Perform all required calculations for a paper element or record."""
+    return METRICS.compute(paper_element, CALCULATION_METRICS)
+
+def iter_validation_report(validation_result):
+    """Generate a markdown validation report as a sequence of text chunks."""
+    yield "# Data Validation Report:\n"
+    yield f"- Total Papers Evaluated: {validation_result['total_papers']}\n"
+    yield "- Fields Checked: paper_title, authors, abstract, content, author_biography\n\n"
+    
+    yield "## Fields Validity\n"
+    for field, valid in validation_result["field_validity"].items():
+        yield f"- {field}: {'valid' if valid else 'invalid'}\n"
+    
+    yield "\n## Validation Summary:\n"
+    if validation_result["valid"]:
+        yield "Data validation is successful! Would you like to proceed with LaTeX document generation?\n"
+    else:
+        for error in validation_result["errors"]:
+            yield f"- {error}\n"
+    
+    # Only present when near-duplicate detection was requested
+    if validation_result.get("near_duplicates") is not None:
+        yield "\n## Near-Duplicate Papers:\n"
+        if not validation_result["near_duplicates"]:
+            yield "No near-duplicate papers found.\n"
+        for first, second, similarity in validation_result["near_duplicates"]:
+            yield f"- WARNING: Paper {first} and Paper {second} are about {similarity * 100:.0f}% similar.\n"
+
+def generate_validation_report(validation_result):
+    """Generate a markdown validation report."""
+    return "".join(iter_validation_report(validation_result))
+
+class CompiledTemplate:
+    """A str.format-style report template compiled once into a render function."""
+    
+    SPEC_PATTERN = re.compile(r'[\w.,%<>=^+\- #]*')
+    
+    def __init__(self, source, name="<template>"):
+        self.source = source
+        self.name = name
+        
+        # Parse into literal text and (field, conversion, spec) placeholders
+        plan = []
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            if literal:
+                plan.append(literal)
+            if field is None:
+                continue
+            if not field.isidentifier():
+                raise ValueError(f"Template {name}: field {{{field}}} must be a plain name")
+            if spec and not self.SPEC_PATTERN.fullmatch(spec):
+                raise ValueError(f"Template {name}: unsupported format spec {spec!r} for field {field}")
+            if conversion not in (None, 'r', 's', 'a'):
+                raise ValueError(f"Template {name}: unsupported conversion !{conversion} for field {field}")
+            plan.append((field, f"!{conversion}" if conversion else "", f":{spec}" if spec else ""))
+        
+        placeholders = [step for step in plan if isinstance(step, tuple)]
+        self.fields = sorted({field for field, _, _ in placeholders})
+        
+        # Placeholders used more than once are formatted into a local up front
+        lines = ["def render(context):"]
+        names = {}
+        for placeholder, uses in Counter(placeholders).items():
+            if uses > 1:
+                names[placeholder] = f"value{len(names)}"
+                field, conversion, spec = placeholder
+                lines.append(f'    {names[placeholder]} = f"{{context[{field!r}]{conversion}{spec}}}"')
+        
+        parts = []
+        for step in plan:
+            if isinstance(step, str):
+                parts.append('f' + repr(step.replace('{', '{{').replace('}', '}}')))
+            elif step in names:
+                parts.append(f'f"{{{names[step]}}}"')
             else:
-                word_counts[word] = 1
-        keyword = max(word_counts, key=word_counts.get)
-        keyword_count = word_counts[keyword]
+                field, conversion, spec = step
+                parts.append(f'f"{{context[{field!r}]{conversion}{spec}}}"')
+        lines.append("    return " + (" ".join(parts) or "''"))
+        
+        namespace = {}
+        exec(compile("\n".join(lines), name, 'exec'), namespace)
+        self.render = namespace["render"]
     
-    keyword_density_value = (keyword_count / total_word_count) * 100 if total_word_count > 0 else 0
+    def __call__(self, context):
+        return self.render(context)
+
+class TemplateSet:
+    """The templates used to render each paper's detailed report, LaTeX document and .tex project files."""
     
-    # Complexity Score
-    normalized_word_count = total_word_count / 1000
-    normalized_avg_sentence = avg_sentence_length / 20
-    normalized_abstract_ratio = abstract_content_ratio / 20
+    REPORT_NAMES = ("detailed_report", "latex_document", "latex_introduction", "latex_section")
+    NAMES = REPORT_NAMES + ("tex_paper", "tex_introduction", "tex_section", "tex_proceedings")
+    # Fields in the context each template is rendered with; the detailed report may also name any reportable metric
+    PAPER_FIELDS = ("title", "authors", "latex_authors", "abstract", "content", "biography")
+    FIELDS = {
+        "detailed_report": PAPER_FIELDS,
+        "latex_document": PAPER_FIELDS + ("body",),
+        "latex_introduction": ("paragraph", "index"),
+        "latex_section": ("paragraph", "index"),
+        "tex_paper": PAPER_FIELDS + ("number", "body"),
+        "tex_introduction": ("paragraph", "index"),
+        "tex_section": ("paragraph", "index"),
+        "tex_proceedings": ("title", "inputs")
+    }
+    
+    def __init__(self, sources=None, math=False):
+        sources = dict(DEFAULT_TEMPLATE_SOURCES, **(sources or {}))
+        unknown = set(sources) - set(self.NAMES)
+        if unknown:
+            raise ValueError(f"Unknown template(s): {', '.join(sorted(unknown))}")
+        self.sources = {name: sources[name] for name in self.NAMES}
+        self.math = math
+        # Only the report templates and escaping affect what the render cache holds
+        report_sources = {name: self.sources[name] for name in self.REPORT_NAMES}
+        self.fingerprint = hashlib.sha256(json.dumps([report_sources, math]).encode('utf-8')).hexdigest()
+        for name in self.NAMES:
+            template = CompiledTemplate(self.sources[name], name)
+            allowed = self.FIELDS[name] + (tuple(METRICS.reportable()) if name == "detailed_report" else ())
+            unknown = [field for field in template.fields if field not in allowed]
+            if unknown:
+                raise ValueError(f"Template {name}: unknown field(s) {', '.join(unknown)}; "
+                                 f"expected any of {', '.join(allowed)}")
+            setattr(self, name, template)
+    
+    def __reduce__(self):
+        # Worker processes receive the sources and reuse their own compiled copy
+        return (template_set, (self.sources, self.math))
+
+def template_set(sources=None, math=False):
+    """Return the compiled TemplateSet for the given sources, compiling it only once per process."""
+    key = json.dumps([sources, math], sort_keys=True)
+    templates = COMPILED_TEMPLATE_SETS.get(key)
+    if templates is None:
+        templates = COMPILED_TEMPLATE_SETS[key] = TemplateSet(sources, math)
+    return templates
+
+def load_template_set(directory, math=False):
+    """Load conference templates from the <name>.tmpl files of a directory, keeping the defaults for missing ones."""
+    sources = {}
+    for name in TemplateSet.NAMES:
+        path = os.path.join(directory, f"{name}.tmpl")
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as template_file:
+                sources[name] = template_file.read()
+    return template_set(sources, math)
+
+def escape_latex(text, math=False):
+    """Escape the LaTeX special characters of a text in one pass, passing trusted math through when math is set."""
+    # Most fields hold no special characters, which substring tests find far faster than a regex scan
+    if not any(special in text for special in LATEX_ESCAPES):
+        return text
+    if math:
+        parts = LATEX_MATH_PATTERN.split(text)
+        parts[::2] = [escape_latex(part) for part in parts[::2]]
+        return "".join(parts)
+    parts = LATEX_SPECIAL_PATTERN.split(text)
+    parts[1::2] = map(LATEX_ESCAPES.__getitem__, parts[1::2])
+    return "".join(parts)
+
+@functools.lru_cache(maxsize=1024)
+def latex_fields(record, math=False):
+    """Return a PaperRecord's fields escaped for LaTeX, remembering recent records so each is escaped once."""
+    title, authors, abstract, content, biography = record
+    return PaperRecord(escape_latex(title, math), tuple(escape_latex(author, math) for author in authors),
+                       escape_latex(abstract, math), escape_latex(content, math), escape_latex(biography, math))
+
+def paper_fields_context(paper):
+    """Build the template context holding a paper's fields and its joined author lists."""
+    title, authors, abstract, content, biography = paper_fields(paper)
+    return {
+        "title": title,
+        "authors": ', '.join(authors),
+        "latex_authors": ' \\and '.join(authors),
+        "abstract": abstract,
+        "content": content,
+        "biography": biography
+    }
+
+def latex_fields_context(paper, math=False):
+    """Build the template context holding a paper's fields escaped for LaTeX."""
+    title, authors, abstract, content, biography = latex_fields(paper_fields(paper), math)
+    return {
+        "title": title,
+        "authors": ', '.join(authors),
+        "latex_authors": ' \\and '.join(authors),
+        "abstract": abstract,
+        "content": content,
+        "biography": biography
+    }
+
+def paper_template_context(paper, calculations, fields=(), metrics=None):
+    """Build the detailed report context from the paper fields, calculations and the named metrics."""
+    context = paper_fields_context(paper)
+    context.update(calculations)
+    if metrics is None:
+        metrics = PaperMetrics(METRICS, paper, calculations)
+    for name in itertools.chain(REPORT_METRICS, fields):
+        if name not in context:
+            context[name] = metrics[name]
+    return context
+
+def render_latex_body(content, templates, introduction=None, section=None):
+    """Render the main content of a paper, one template per paragraph."""
+    introduction = introduction or templates.latex_introduction
+    section = section or templates.latex_section
+    paragraphs = content.split('\n\n')
+    body = [introduction({"paragraph": paragraphs[0], "index": 0})]
+    for i in range(1, len(paragraphs)):
+        body.append(section({"paragraph": paragraphs[i], "index": i}))
+    return "".join(body)
+
+DEFAULT_TEMPLATES = template_set()
+
+def iter_detailed_report(paper_element, calculations, templates=None):
+    """Generate a detailed report for a paper element or record as a sequence of text chunks."""
+    templates = templates or DEFAULT_TEMPLATES
+    yield templates.detailed_report(paper_template_context(paper_element, calculations, templates.detailed_report.fields))
+
+def generate_detailed_report(paper_element, calculations, templates=None):
+    """Generate a detailed report for a paper element or record."""
+    return "".join(iter_detailed_report(paper_element, calculations, templates))
+
+def iter_latex_document(paper_element, templates=None):
+    """Generate LaTeX document sections for a paper element or record as a sequence of text chunks."""
+    templates = templates or DEFAULT_TEMPLATES
+    context = latex_fields_context(paper_element, templates.math)
+    context["body"] = render_latex_body(context["content"], templates)
+    yield templates.latex_document(context)
+
+def generate_latex_document(paper_element, templates=None):
+    """Generate LaTeX document sections for a paper element or record."""
+    return "".join(iter_latex_document(paper_element, templates))
+
+class RenderCache:
+    """SQLite cache of per-paper output keyed by paper_cache_key, trimmed to max_bytes and max_entries."""
+    
+    SCHEMA_VERSION = 1
+    # Marks SQLite files created by RenderCache ("LCDG")
+    APPLICATION_ID = 0x4C434447
+    # Writes are committed in batches of this many, so other runs are never locked out for long
+    COMMIT_EVERY = 64
+    # Seconds to wait for another run's batch before treating the cache as unavailable
+    LOCK_TIMEOUT = 5
+    
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, max_entries=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.pending = 0
+        self.connection = self._open()
+        self.size, self.entries = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries").fetchone()
+        self.clock = self.connection.execute("SELECT COALESCE(MAX(last_used), 0) FROM entries").fetchone()[0]
+        if self.over_budget() and self.begin():
+            self.evict()
+            self.commit()
+    
+    def _open(self):
+        connection = sqlite3.connect(self.path, timeout=self.LOCK_TIMEOUT)
+        try:
+            application_id = connection.execute("PRAGMA application_id").fetchone()[0]
+            empty = connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0
+        except sqlite3.OperationalError:
+            # A locked cache is busy, not foreign
+            connection.close()
+            raise
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise ValueError(f"{self.path} is not a render cache; refusing to overwrite it") from None
+        if application_id != self.APPLICATION_ID and not empty:
+            connection.close()
+            raise ValueError(f"{self.path} is not a render cache; refusing to overwrite it")
+        
+        # Only a new file or one of our own caches gets here
+        if empty:
+            connection.execute(f"PRAGMA application_id = {self.APPLICATION_ID}")
+        if connection.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            connection.execute("DROP TABLE IF EXISTS entries")
+            connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, calculations TEXT, detailed TEXT, latex TEXT, "
+            "size INTEGER, last_used INTEGER)")
+        connection.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        connection.commit()
+        return connection
+    
+    def get(self, key):
+        """Return the cached (calculations, detailed report, LaTeX) for key, or None."""
+        try:
+            row = self.connection.execute(
+                "SELECT calculations, detailed, latex FROM entries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError as error:
+            if not is_lock_error(error):
+                raise
+            row = None
+        if row is not None:
+            try:
+                calculations = json.loads(row[0])
+            except ValueError:
+                if self.begin():
+                    self.delete(key)
+                    self.wrote()
+            else:
+                self.clock += 1
+                if self.begin():
+                    self.connection.execute("UPDATE entries SET last_used = ? WHERE key = ?", (self.clock, key))
+                    self.wrote()
+                self.hits += 1
+                return calculations, row[1], row[2]
+        self.misses += 1
+        return None
+    
+    def put(self, key, calculations, detailed, latex):
+        """Store the rendered output of a paper and evict old entries if over budget."""
+        # A paper that cannot be stored while another run holds the cache is rendered again next time
+        if not self.begin():
+            return
+        self.delete(key)
+        size = len(detailed) + len(latex)
+        self.clock += 1
+        self.connection.execute(
+            "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+            (key, json.dumps(calculations), detailed, latex, size, self.clock))
+        self.size += size
+        self.entries += 1
+        if self.over_budget():
+            self.evict()
+        self.wrote()
+    
+    def begin(self):
+        """Take the write lock for a batch of writes, returning False when another run keeps it."""
+        if self.connection.in_transaction:
+            return True
+        try:
+            self.connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as error:
+            if not is_lock_error(error):
+                raise
+            return False
+        # Other runs may have changed the cache since the last batch
+        self.size, self.entries = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries").fetchone()
+        return True
+    
+    def wrote(self):
+        """Count a write of the current batch, committing the batch once it is full."""
+        self.pending += 1
+        if self.pending >= self.COMMIT_EVERY:
+            self.commit()
+    
+    def commit(self):
+        """Commit the current batch; while another run is reading it stays pending."""
+        try:
+            self.connection.commit()
+        except sqlite3.OperationalError as error:
+            if not is_lock_error(error):
+                raise
+            return
+        self.pending = 0
+    
+    def over_budget(self):
+        """Whether the cache holds more than max_bytes or max_entries."""
+        return self.size > self.max_bytes or (self.max_entries is not None and self.entries > self.max_entries)
+    
+    def delete(self, key):
+        """Remove a single entry if it exists; the write lock must be held."""
+        row = self.connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.size -= row[0]
+            self.entries -= 1
+    
+    def evict(self):
+        """Drop least recently used entries until under 90% of the limits; the write lock must be held."""
+        target_bytes = self.max_bytes * 0.9
+        target_entries = None if self.max_entries is None else int(self.max_entries * 0.9)
+        victims = []
+        size, entries = self.size, self.entries
+        for key, entry_size in self.connection.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if size <= target_bytes and (target_entries is None or entries <= target_entries):
+                break
+            victims.append((key,))
+            size -= entry_size
+            entries -= 1
+        self.connection.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.size, self.entries = size, entries
+    
+    def clear(self):
+        """Remove every entry."""
+        self.connection.execute("DELETE FROM entries")
+        self.connection.commit()
+        self.size = self.entries = self.pending = 0
+    
+    def close(self):
+        """Commit pending changes and close the cache file; a batch still locked out is dropped."""
+        self.commit()
+        self.connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def is_lock_error(error):
+    """Whether an sqlite3.OperationalError means the database stayed locked by another connection."""
+    return "locked" in str(error)
+
+def paper_cache_key(record, templates=None):
+    """Hash a paper record together with the generator version and the templates in use."""
+    title, authors, abstract, content, biography = record
+    fingerprint = (templates or DEFAULT_TEMPLATES).fingerprint
+    payload = json.dumps([GENERATOR_VERSION, fingerprint, title, list(authors), abstract, content, biography])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class PipelineProfiler:
+    """Collects wall-clock and CPU time per pipeline stage and per paper, passing each sample to the hooks."""
+    
+    STAGES = ("parse", "validate", "calculations", "detailed_report", "latex_document", "total")
+    
+    def __init__(self, trace_memory=False, per_paper=True):
+        self.trace_memory = trace_memory
+        self.per_paper = per_paper
+        self.hooks = []
+        self.stages = {stage: {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0} for stage in self.STAGES}
+        self.papers = []
+        self.papers_rendered = 0
+        self.bytes_parsed = 0
+        self.bytes_emitted = 0
+        self.peak_memory_bytes = None
+    
+    def add_hook(self, hook):
+        """Register a callable that receives every measurement as it is recorded."""
+        self.hooks.append(hook)
+    
+    def record(self, stage, wall, cpu, paper=None):
+        """Add one measurement of a stage."""
+        totals = self.stages.setdefault(stage, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+        totals["calls"] += 1
+        totals["wall_s"] += wall
+        totals["cpu_s"] += cpu
+        for hook in self.hooks:
+            hook({"stage": stage, "paper": paper, "wall_s": wall, "cpu_s": cpu})
+    
+    def record_paper(self, timings):
+        """Add the per-stage timings returned by render_paper_timed for the next paper."""
+        self.papers_rendered += 1
+        paper = self.papers_rendered
+        for stage, (wall, cpu) in timings.items():
+            self.record(stage, wall, cpu, paper)
+        if self.per_paper:
+            self.papers.append({"paper": paper, **{stage: {"wall_s": wall, "cpu_s": cpu}
+                                                   for stage, (wall, cpu) in timings.items()}})
+    
+    @contextlib.contextmanager
+    def stage(self, stage):
+        """Time a block of code as one measurement of a corpus-wide stage."""
+        start, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, time.process_time() - start_cpu)
+    
+    def timed_iter(self, iterable, stage):
+        """Yield from an iterable, recording the time spent producing each item."""
+        iterator = iter(iterable)
+        while True:
+            start, start_cpu = time.perf_counter(), time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.record(stage, time.perf_counter() - start, time.process_time() - start_cpu)
+                return
+            self.record(stage, time.perf_counter() - start, time.process_time() - start_cpu)
+            yield item
+    
+    def track(self, chunks):
+        """Wrap a report chunk generator, timing the whole run and counting emitted bytes."""
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        try:
+            with self.stage("total"):
+                for chunk in chunks:
+                    self.bytes_emitted += len(chunk.encode('utf-8'))
+                    yield chunk
+        finally:
+            if self.trace_memory:
+                self.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+    
+    def to_dict(self):
+        """Return all collected metrics as plain data."""
+        return {
+            "stages": {stage: dict(totals) for stage, totals in self.stages.items()},
+            "papers_rendered": self.papers_rendered,
+            "bytes_parsed": self.bytes_parsed,
+            "bytes_emitted": self.bytes_emitted,
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "papers": self.papers
+        }
+    
+    def to_json(self, indent=2):
+        """Return the collected metrics as a JSON document."""
+        return json.dumps(self.to_dict(), indent=indent)
+    
+    def to_prometheus(self, prefix="latex_docgen"):
+        """Return the corpus-wide metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, key, help_text in (
+                ("stage_calls_total", "calls", "Measurements recorded per pipeline stage."),
+                ("stage_wall_seconds_total", "wall_s", "Wall-clock time spent per pipeline stage."),
+                ("stage_cpu_seconds_total", "cpu_s", "CPU time spent per pipeline stage.")):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for stage, totals in self.stages.items():
+                lines.append(f'{prefix}_{name}{{stage="{stage}"}} {totals[key]!r}')
+        for name, value, help_text in (
+                ("papers_rendered_total", self.papers_rendered, "Papers rendered."),
+                ("bytes_parsed_total", self.bytes_parsed, "Bytes of XML input parsed."),
+                ("bytes_emitted_total", self.bytes_emitted, "Bytes of report output emitted.")):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            lines.append(f"{prefix}_{name} {value}")
+        if self.peak_memory_bytes is not None:
+            lines.append(f"# HELP {prefix}_peak_memory_bytes Peak traced Python heap usage of the run.")
+            lines.append(f"# TYPE {prefix}_peak_memory_bytes gauge")
+            lines.append(f"{prefix}_peak_memory_bytes {self.peak_memory_bytes}")
+        return "\n".join(lines) + "\n"
+
+class CountingReader:
+    """File-like wrapper that counts the bytes read through it."""
+    
+    def __init__(self, source, profiler):
+        self.source = source
+        self.profiler = profiler
+    
+    def read(self, size=-1):
+        data = self.source.read(size)
+        self.profiler.bytes_parsed += len(data) if isinstance(data, bytes) else len(data.encode('utf-8'))
+        return data
+
+def render_paper(paper, templates=None, timings=None):
+    """Compute a paper's calculations and render its sections, storing stage timings in timings if given."""
+    templates = templates or DEFAULT_TEMPLATES
+    if timings is not None:
+        start, start_cpu = time.perf_counter(), time.process_time()
+    record = paper_fields(paper)
+    metrics = PaperMetrics(METRICS, record)
+    calculations = metrics.compute(CALCULATION_METRICS)
+    if timings is not None:
+        lap, lap_cpu = time.perf_counter(), time.process_time()
+        timings["calculations"] = (lap - start, lap_cpu - start_cpu)
+        start, start_cpu = lap, lap_cpu
     
-    complexity_score = (normalized_word_count * 0.3) + (normalized_avg_sentence * 0.4) + (normalized_abstract_ratio * 0.3)
+    detailed = templates.detailed_report(paper_template_context(record, calculations, templates.detailed_report.fields,
+                                                                metrics))
+    if timings is not None:
+        lap, lap_cpu = time.perf_counter(), time.process_time()
+        timings["detailed_report"] = (lap - start, lap_cpu - start_cpu)
+        start, start_cpu = lap, lap_cpu
+    
+    context = latex_fields_context(record, templates.math)
+    context["body"] = render_latex_body(context["content"], templates)
+    latex = templates.latex_document(context)
+    if timings is not None:
+        timings["latex_document"] = (time.perf_counter() - start, time.process_time() - start_cpu)
+    return calculations, detailed, latex
+
+def render_paper_timed(paper, templates=None):
+    """Render a paper, returning the output of render_paper and its per-stage timings."""
+    timings = {}
+    return render_paper(paper, templates, timings), timings
+
+def render_papers(papers, workers=1, chunksize=16, cache=None, templates=None, profiler=None):
+    """Render papers, yielding (calculations, detailed report, LaTeX) in input order."""
+    if workers <= 1:
+        def render_one(paper):
+            if profiler is None:
+                return render_paper(paper, templates)
+            rendered, timings = render_paper_timed(paper, templates)
+            profiler.record_paper(timings)
+            return rendered
+        
+        for paper in papers:
+            if cache is None:
+                yield render_one(paper)
+                continue
+            key = paper_cache_key(paper_fields(paper), templates)
+            rendered = cache.get(key)
+            if rendered is None:
+                rendered = render_one(paper)
+                cache.put(key, *rendered)
+            yield rendered
+        return
+    
+    def submit(batch):
+        if cache is not None:
+            keys = [paper_cache_key(paper_fields(paper), templates) for paper in batch]
+            cached = [cache.get(key) for key in keys]
+        else:
+            keys = cached = [None] * len(batch)
+        misses = [paper for paper, rendered in zip(batch, cached) if rendered is None]
+        return keys, cached, executor.map(render, misses, chunksize=chunksize)
+    
+    def drain(keys, cached, results):
+        for key, rendered in zip(keys, cached):
+            if rendered is None:
+                rendered = next(results)
+                if profiler is not None:
+                    rendered, timings = rendered
+                    profiler.record_paper(timings)
+                if cache is not None:
+                    cache.put(key, *rendered)
+            yield rendered
+    
+    render = render_paper if profiler is None else render_paper_timed
+    if templates is not None:
+        render = functools.partial(render, templates=templates)
+    batch_size = workers * chunksize * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        batch = []
+        for paper in papers:
+            batch.append(paper)
+            if len(batch) == batch_size:
+                pending.append(submit(batch))
+                batch = []
+                # Keep the next batch rendering while the oldest one is drained
+                if len(pending) > 1:
+                    yield from drain(*pending.popleft())
+        if batch:
+            pending.append(submit(batch))
+        while pending:
+            yield from drain(*pending.popleft())
+
+def render_sections(papers, workers=1, chunksize=16, cache=None, counts=None, templates=None, profiler=None):
+    """Render paper sections (detailed report followed by LaTeX), yielding them in input order."""
+    for calculations, detailed, latex in render_papers(papers, workers, chunksize, cache, templates, profiler):
+        if counts is not None:
+            counts.append(tuple(calculations[field] for field in RAW_COUNT_FIELDS))
+        yield detailed + "---\n\n" + latex
+
+def require_numpy():
+    """Raise a helpful error when the optional numpy dependency is missing."""
+    if np is None:
+        raise ImportError("numpy is required for batch metrics and corpus statistics; install it with 'pip install numpy'")
+
+def paper_counts(paper):
+    """Return the raw counts of a paper element or record, in RAW_COUNT_FIELDS order."""
+    return tuple(METRICS.compute(paper, RAW_COUNT_FIELDS).values())
+
+def batch_metrics(counts):
+    """Compute the numeric metrics of perform_calculations for rows of RAW_COUNT_FIELDS counts at once."""
+    require_numpy()
+    counts = np.asarray(counts, dtype=np.float64).reshape(-1, len(RAW_COUNT_FIELDS))
+    abstract_words, content_words, characters, abstract_sentences, content_sentences, keyword_count = counts.T
+    
+    def ratio(numerator, denominator):
+        # Papers with a zero denominator get 0, as in perform_calculations
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+    
+    total_words = abstract_words + content_words
+    total_sentences = abstract_sentences + content_sentences
+    abstract_content_ratio = ratio(abstract_words, content_words) * 100
+    avg_sentence_length = ratio(total_words, total_sentences)
     
     return {
-        "abstract_word_count": abstract_word_count,
-        "content_word_count": content_word_count,
-        "total_word_count": total_word_count,
+        "abstract_word_count": abstract_words,
+        "content_word_count": content_words,
+        "total_word_count": total_words,
         "abstract_content_ratio": abstract_content_ratio,
-        "avg_word_length": avg_word_length,
+        "total_characters": characters,
+        "avg_word_length": ratio(characters, total_words),
         "abstract_sentences": abstract_sentences,
         "content_sentences": content_sentences,
         "total_sentences": total_sentences,
         "avg_sentence_length": avg_sentence_length,
-        "reading_time": reading_time,
-        "keyword": keyword,
+        "reading_time": total_words / 200,
         "keyword_count": keyword_count,
-        "keyword_density": keyword_density_value,
-        "complexity_score": complexity_score
+        "keyword_density": ratio(keyword_count, total_words) * 100,
+        "complexity_score": ((total_words / 1000) * 0.3) + ((avg_sentence_length / 20) * 0.4)
+                            + ((abstract_content_ratio / 20) * 0.3)
     }
 
-def generate_validation_report(validation_result):
-    """Generate a markdown validation report."""
-    report = "# Data Validation Report:\n"
-    report += f"- Total Papers Evaluated: {validation_result['total_papers']}\n"
-    report += "- Fields Checked: paper_title, authors, abstract, content, author_biography\n\n"
+def collect_batch_metrics(papers):
+    """Compute batch_metrics for an iterable of paper elements or records."""
+    return batch_metrics([paper_counts(paper) for paper in papers])
+
+def corpus_statistics(metrics, percentiles=(25, 50, 75, 90, 99)):
+    """Summarise batch metrics over the corpus, with percentiles and complexity outliers."""
+    require_numpy()
+    papers = len(metrics["complexity_score"])
+    statistics = {"total_papers": papers, "percentiles": tuple(percentiles), "metrics": {}, "outliers": []}
+    if papers == 0:
+        return statistics
     
-    report += "## Fields Validity\n"
-    for field, valid in validation_result["field_validity"].items():
-        report += f"- {field}: {'valid' if valid else 'invalid'}\n"
+    for name in CORPUS_METRICS:
+        values = metrics[name]
+        statistics["metrics"][name] = {
+            "mean": float(values.mean()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "percentiles": [float(value) for value in np.percentile(values, percentiles)]
+        }
     
-    report += "\n## Validation Summary:\n"
-    if validation_result["valid"]:
-        report += "Data validation is successful! Would you like to proceed with LaTeX document generation?\n"
+    complexity = metrics["complexity_score"]
+    q1, q3 = np.percentile(complexity, (25, 75))
+    fence = 1.5 * (q3 - q1)
+    outliers = np.flatnonzero((complexity < q1 - fence) | (complexity > q3 + fence))
+    statistics["outliers"] = [(int(index) + 1, float(complexity[index])) for index in outliers]
+    return statistics
+
+def iter_corpus_report(statistics):
+    """Generate a markdown summary of corpus statistics as text chunks."""
+    yield "## Corpus Statistics\n\n"
+    yield f"**Papers Analysed:** {statistics['total_papers']}\n\n"
+    if not statistics["metrics"]:
+        return
+    
+    percentile_headers = "".join(f" P{percentile} |" for percentile in statistics["percentiles"])
+    yield f"| Metric | Mean | Min |{percentile_headers} Max |\n"
+    yield "|---" * (4 + len(statistics["percentiles"])) + "|\n"
+    for name, summary in statistics["metrics"].items():
+        percentile_cells = "".join(f" {value:.2f} |" for value in summary["percentiles"])
+        yield f"| {name} | {summary['mean']:.2f} | {summary['min']:.2f} |{percentile_cells} {summary['max']:.2f} |\n"
+    
+    yield "\n### Complexity Score Outliers\n"
+    if statistics["outliers"]:
+        for index, score in statistics["outliers"]:
+            yield f"- Paper {index}: {score:.2f}\n"
     else:
-        for error in validation_result["errors"]:
-            report += f"- {error}\n"
+        yield "- None\n"
+    yield "\n"
+
+def generate_corpus_report(statistics):
+    """Generate a markdown summary of corpus statistics."""
+    return "".join(iter_corpus_report(statistics))
+
+class TermIndex:
+    """Inverted index of the content terms of every paper in a corpus."""
+    
+    def __init__(self, stopwords=STOPWORDS, min_term_length=3):
+        self.stopwords = frozenset(stopwords)
+        self.min_term_length = min_term_length
+        # Each count is kept once, in its paper's terms; only the number of papers per term is kept alongside
+        self.paper_terms = []
+        self.document_frequency = Counter()
+        self.word_counts = []
     
-    return report
+    def add(self, content):
+        """Index the content of the next paper and return its position."""
+        stats = text_statistics(content, count_terms=True, stopwords=(), min_term_length=1)
+        paper = len(self.paper_terms)
+        self.paper_terms.append(stats["terms"])
+        self.document_frequency.update(stats["terms"].keys())
+        self.word_counts.append(stats["words"])
+        return paper
+    
+    def __len__(self):
+        return len(self.paper_terms)
+    
+    def normalize(self, keyword):
+        """Lowercase a keyword and check that it is a single indexed word."""
+        term = keyword.lower()
+        if not WORD_PATTERN.fullmatch(term):
+            raise ValueError(f"TermIndex only answers single-word keywords, got {keyword!r}; use keyword_density for phrases")
+        return term
+    
+    def count(self, keyword, paper):
+        """Number of case-insensitive occurrences of keyword in a paper's content."""
+        return self.paper_terms[paper].get(self.normalize(keyword), 0)
+    
+    def density(self, keyword, paper):
+        """Keyword density of a paper's content as a percentage, like keyword_density."""
+        total_words = self.word_counts[paper]
+        if total_words == 0:
+            return 0
+        return (self.count(keyword, paper) / total_words) * 100
+    
+    def papers_mentioning(self, keyword):
+        """Return {paper: occurrences} for every paper whose content mentions keyword."""
+        term = self.normalize(keyword)
+        return {paper: terms[term] for paper, terms in enumerate(self.paper_terms) if term in terms}
+    
+    def idf(self, term):
+        """Smoothed inverse document frequency of a term."""
+        return math.log((1 + len(self)) / (1 + self.document_frequency[term])) + 1
+    
+    def tf_idf(self, keyword, paper):
+        """TF-IDF weight of keyword in a paper, using term frequency relative to the paper's length."""
+        term = self.normalize(keyword)
+        total_words = self.word_counts[paper]
+        if total_words == 0:
+            return 0
+        return (self.paper_terms[paper].get(term, 0) / total_words) * self.idf(term)
+    
+    def top_keywords(self, paper, k=10, weighting="tfidf"):
+        """Return the k highest-weighted (term, weight) pairs of a paper, ignoring stopwords."""
+        if weighting not in ("tfidf", "count"):
+            raise ValueError(f"Unknown weighting {weighting!r}; expected 'tfidf' or 'count'")
+        total_words = self.word_counts[paper]
+        candidates = ((term, count) for term, count in self.paper_terms[paper].items()
+                      if term not in self.stopwords and len(term) >= self.min_term_length)
+        if weighting == "count":
+            scored = candidates
+        else:
+            scored = ((term, (count / total_words) * self.idf(term)) for term, count in candidates)
+        return heapq.nlargest(k, scored, key=lambda item: item[1])
 
-def generate_detailed_report(paper_element, calculations):
-    """Generate a detailed report for a paper."""
-    title = paper_element.find('paper_title').text
+def build_term_index(source, stopwords=STOPWORDS, min_term_length=3):
+    """Build a TermIndex from an XML file or file-like object, parsing it incrementally."""
+    index = TermIndex(stopwords, min_term_length)
+    for element in iter_root_children(source):
+        if element.tag == 'paper':
+            index.add(element.findtext('content'))
+    return index
+
+def iter_keyword_report(index, keywords, top_k=5):
+    """Generate a markdown report of keyword usage across the corpus as text chunks."""
+    yield "# Keyword Report\n\n"
+    yield f"**Papers Indexed:** {len(index)}\n\n"
+    for keyword in keywords:
+        mentions = index.papers_mentioning(keyword)
+        yield f"## Keyword: {keyword}\n\n"
+        yield f"- **Papers Mentioning:** {len(mentions)}\n"
+        for paper, count in sorted(mentions.items()):
+            yield f"- Paper {paper + 1}: {count} occurrence(s), density {index.density(keyword, paper):.2f}%\n"
+        yield "\n"
     
-    # Get authors
-    authors_element = paper_element.find('authors')
-    authors = []
-    for author_element in authors_element.findall('author'):
-        if author_element.text:
-            authors.append(author_element.text)
+    yield "## Top Keywords per Paper\n\n"
+    for paper in range(len(index)):
+        keywords = ", ".join(f"{term} ({weight:.4f})" for term, weight in index.top_keywords(paper, top_k))
+        yield f"- Paper {paper + 1}: {keywords}\n"
+
+def generate_keyword_report(index, keywords, top_k=5):
+    """Generate a markdown report of keyword usage across the corpus."""
+    return "".join(iter_keyword_report(index, keywords, top_k))
+
+class NearDuplicateIndex:
+    """Finds near-duplicate papers with one-permutation MinHash signatures and LSH banding."""
     
-    abstract = paper_element.find('abstract').text
-    content = paper_element.find('content').text
-    biography = paper_element.find('author_biography').text
-    
-    # Format the detailed report
-    report = f"### Paper: {title}\n\n"
-    report += "#### Input Data:\n"
-    report += f"- **Paper Title:** {title}\n"
-    report += f"- **Authors:** {', '.join(authors)}\n"
-    report += "- **Abstract:**  \n"
-    report += f"  {abstract}\n"
-    report += "- **Content:**  \n"
-    report += f"  {content}\n"
-    report += "- **Author Biography:**  \n"
-    report += f"  {biography}\n\n"
-    
-    report += "---\n\n"
-    report += "#### Detailed Calculations:\n\n"
+    MIX = 0x9E3779B1
+    EMPTY = 1 << 32
     
-    # 1. Word Count Calculation
-    report += "1. **Word Count Calculation:**\n"
-    report += " - **Formula:** $ \\text{Word Count} = \\text{words in abstract} + \\text{words in content} $\n"
-    report += " - **Steps:**\n"
-    report += f"   - Count the number of words in the abstract: {calculations['abstract_word_count']}\n"
-    report += f"   - Count the number of words in the content: {calculations['content_word_count']}\n"
-    report += f"   - Add both counts together: {calculations['abstract_word_count']} + {calculations['content_word_count']} = {calculations['total_word_count']}\n"
-    report += f" - **Final Word Count:** **{calculations['total_word_count']:.2f}**\n\n"
+    def __init__(self, threshold=0.8, num_perm=128, bands=16, shingle_size=4):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+        self.candidates = set()
     
-    # 2. Abstract to Content Ratio
-    report += "2. **Abstract to Content Ratio Calculation:**\n"
-    report += " - **Formula:** $ \\text{Abstract to Content Ratio} = \\left(\\frac{\\text{words in abstract}}{\\text{words in content}}\\right) \\times 100 $\n"
-    report += " - **Steps:**\n"
-    report += f"   - Divide the abstract word count by the content word count: {calculations['abstract_word_count']} ÷ {calculations['content_word_count']} = {calculations['abstract_word_count'] / calculations['content_word_count']:.4f}\n"
-    report += f"   - Multiply the result by 100: {calculations['abstract_word_count'] / calculations['content_word_count']:.4f} × 100 = {calculations['abstract_content_ratio']:.2f}%\n"
-    report += f" - **Final Ratio:** **{calculations['abstract_content_ratio']:.2f}%**\n\n"
+    def signature(self, text):
+        """Return the MinHash signature of a text, or None when it has no words."""
+        words = word_tokens(text or "")
+        if not words:
+            return None
+        size = min(self.shingle_size, len(words))
+        num_perm = self.num_perm
+        signature = [self.EMPTY] * num_perm
+        for i in range(len(words) - size + 1):
+            shingle = zlib.crc32(" ".join(words[i:i + size]).encode('utf-8'))
+            value = (shingle * self.MIX) & 0xFFFFFFFF
+            position = shingle % num_perm
+            if value < signature[position]:
+                signature[position] = value
+        
+        # Fill empty bins from the next filled bin, offset by the distance to it
+        if self.EMPTY in signature:
+            filled = signature[:]
+            for position in range(num_perm):
+                distance = 1
+                while filled[position] == self.EMPTY:
+                    filled[position] = signature[(position + distance) % num_perm]
+                    if filled[position] != self.EMPTY:
+                        filled[position] += distance * self.EMPTY
+                    distance += 1
+            signature = filled
+        return array('Q', signature)
     
-    # 3. Average Word Length
-    report += "3. **Average Word Length Calculation:**\n"
-    report += " - **Formula:** $ \\text{Average Word Length} = \\frac{\\text{Total Characters (excluding spaces)}}{\\text{Total Word Count}} $\n"
-    report += " - **Steps:**\n"
-    total_chars = count_characters_no_spaces(abstract + content)
-    report += f"   - Count all characters in the abstract and content, excluding spaces: {total_chars}\n"
-    report += f"   - Divide the total number of characters by the total word count: {total_chars} ÷ {calculations['total_word_count']} = {calculations['avg_word_length']:.4f}\n"
-    report += f" - **Final Average Word Length:** **{calculations['avg_word_length']:.2f} characters**\n\n"
+    def add(self, content, paper):
+        """Add a paper's content under its paper number, recording candidate pairs."""
+        signature = self.signature(content)
+        if signature is None:
+            return
+        self.signatures[paper] = signature
+        rows = self.rows
+        for band, buckets in enumerate(self.buckets):
+            bucket = buckets.setdefault(hash(tuple(signature[band * rows:(band + 1) * rows])), [])
+            for other in bucket:
+                self.candidates.add((min(other, paper), max(other, paper)))
+            bucket.append(paper)
     
-    # 4. Sentence Count
-    report += "4. **Sentence Count Calculation:**\n"
-    report += " - **Formula:** $ \\text{Total Sentences} = \\text{Sentences in abstract} + \\text{Sentences in content} $\n"
-    report += " - **Steps:**\n"
-    report += f"   - Identify and count the number of sentences in the abstract: {calculations['abstract_sentences']}\n"
-    report += f"   - Identify and count the number of sentences in the content: {calculations['content_sentences']}\n"
-    report += f"   - Add both counts together: {calculations['abstract_sentences']} + {calculations['content_sentences']} = {calculations['total_sentences']}\n"
-    report += f" - **Final Sentence Count:** **{calculations['total_sentences']}**\n\n"
+    def __len__(self):
+        return len(self.signatures)
     
-    # 5. Average Sentence Length
-    report += "5. **Average Sentence Length Calculation:**\n"
-    report += " - **Formula:** $ \\text{Average Sentence Length} = \\frac{\\text{Word Count}}{\\text{Total Sentences}} $\n"
-    report += " - **Steps:**\n"
-    report += f"   - Use the total word count from the Word Count Calculation: {calculations['total_word_count']}\n"
-    report += f"   - Divide the total word count by the total number of sentences: {calculations['total_word_count']} ÷ {calculations['total_sentences']} = {calculations['avg_sentence_length']:.4f}\n"
-    report += f" - **Final Average Sentence Length:** **{calculations['avg_sentence_length']:.2f} words per sentence**\n\n"
+    def pairs(self):
+        """Return (paper, paper, estimated similarity) for every near-duplicate pair, in paper order."""
+        pairs = []
+        for first, second in sorted(self.candidates):
+            agreeing = sum(a == b for a, b in zip(self.signatures[first], self.signatures[second]))
+            similarity = agreeing / self.num_perm
+            if similarity >= self.threshold:
+                pairs.append((first, second, similarity))
+        return pairs
+
+def compute_source_metrics(source, names, registry=None):
+    """Compute the named metrics of every paper of an XML source, returning the report and the metrics or None."""
+    with ParsedSource(source) as parsed:
+        records = iter_valid_records(parsed.children(), parsed.validation_result)
+        metrics = [compute_metrics(record, names, registry) for record in records]
+    validation_result = parsed.validation_result
+    return validation_result, metrics if validation_result["valid"] else None
+
+def iter_metrics_report(metrics, names):
+    """Generate a markdown table of the named metrics of each paper as text chunks."""
+    yield "# Paper Metrics\n\n"
+    yield "| Paper | " + " | ".join(names) + " |\n"
+    yield "|---" * (len(names) + 1) + "|\n"
+    for number, values in enumerate(metrics, 1):
+        cells = [f"{values[name]:.2f}" if isinstance(values[name], float) else str(values[name]) for name in names]
+        yield f"| {number} | " + " | ".join(cells) + " |\n"
+
+def generate_metrics_report(metrics, names):
+    """Generate a markdown table of the named metrics of each paper."""
+    return "".join(iter_metrics_report(metrics, names))
+
+def iter_cache_report(hits, misses):
+    """Generate a markdown summary of render cache usage as text chunks."""
+    yield "## Render Cache\n\n"
+    yield f"- **Cache Hits:** {hits}\n"
+    yield f"- **Cache Misses:** {misses}\n"
+
+def generate_cache_report(hits, misses):
+    """Generate a markdown summary of render cache usage."""
+    return "".join(iter_cache_report(hits, misses))
+
+def iter_summary_header(total_papers):
+    """Generate the heading of the LaTeX conference document summary as text chunks."""
+    yield "# LaTeX Conference Document Summary\n\n"
+    yield f"**Total Papers Processed:** {total_papers}\n\n"
+    yield "---\n\n"
+    yield "## Detailed Analysis per Paper\n\n"
+
+def iter_xml_report(xml_string, workers=1, chunksize=16, cache=None, corpus_stats=False, templates=None,
+                    profiler=None, max_errors=None, positions=False, duplicates=None):
+    """Process XML data and generate the report as a sequence of text chunks."""
+    chunks = xml_report_chunks(xml_string, workers, chunksize, cache, corpus_stats, templates, profiler,
+                               max_errors, positions, duplicates)
+    return chunks if profiler is None else profiler.track(chunks)
+
+def xml_report_chunks(xml_string, workers=1, chunksize=16, cache=None, corpus_stats=False, templates=None,
+                      profiler=None, max_errors=None, positions=False, duplicates=None):
+    """Generate the report for XML data as a sequence of text chunks."""
+    if corpus_stats:
+        require_numpy()
+    validation_result, records = validate_xml_data(xml_string, profiler, max_errors, positions, duplicates)
     
-    # 6. Reading Time Estimation
-    report += "6. **Reading Time Estimation:**\n"
-    report += " - **Formula:** $ \\text{Estimated Reading Time (minutes)} = \\frac{\\text{Word Count}}{200} $\n"
-    report += " - **Steps:**\n"
-    report += "   - Assume an average reading speed of 200 words per minute.\n"
-    report += f"   - Divide the total word count by 200: {calculations['total_word_count']} ÷ 200 = {calculations['reading_time']:.4f}\n"
-    report += f" - **Final Estimated Reading Time:** **{calculations['reading_time']:.2f} minutes**\n\n"
+    # Generate validation report
+    yield from iter_validation_report(validation_result)
     
-    # 7. Keyword Density
-    report += "7. **Keyword Density Calculation:**\n"
-    report += " - **Formula:** $ \\text{Keyword Density (\\%)} = \\left(\\frac{\\text{Keyword Occurrences}}{\\text{Word Count}}\\right) \\times 100 $\n"
-    report += " - **Steps:**\n"
-    report += f"   - Most frequent keyword identified: '{calculations['keyword']}'\n"
-    report += f"   - Count the number of times the keyword appears in the content: {calculations['keyword_count']}\n"
-    report += f"   - Divide the keyword occurrence count by the total word count: {calculations['keyword_count']} ÷ {calculations['total_word_count']} = {calculations['keyword_count'] / calculations['total_word_count']:.4f}\n"
-    report += f"   - Multiply the result by 100: {calculations['keyword_count'] / calculations['total_word_count']:.4f} × 100 = {calculations['keyword_density']:.2f}%\n"
-    report += f" - **Final Keyword Density:** **{calculations['keyword_density']:.2f}%**\n\n"
+    # If validation failed, emit only the validation report
+    if not validation_result["valid"] or records is None:
+        return
     
-    # 8. Complexity Score
-    report += "8. **Complexity Score Calculation:**\n"
-    report += " - **Formula:**  \n"
-    report += " $$ \\text{Complexity Score} = \\left(\\frac{\\text{Word Count}}{1000} \\times 0.3\\right) + \\left(\\frac{\\text{Average Sentence Length}}{20} \\times 0.4\\right) + \\left(\\frac{\\text{Abstract to Content Ratio}}{20} \\times 0.3\\right) $$\n"
-    report += " - **Steps:**\n"
-    normalized_word_count = calculations['total_word_count'] / 1000
-    normalized_avg_sentence = calculations['avg_sentence_length'] / 20
-    normalized_abstract_ratio = calculations['abstract_content_ratio'] / 20
-    
-    report += f"   - Normalize the Word Count by dividing it by 1000: {calculations['total_word_count']} ÷ 1000 = {normalized_word_count:.4f}\n"
-    report += f"   - Normalize the Average Sentence Length by dividing it by 20: {calculations['avg_sentence_length']:.2f} ÷ 20 = {normalized_avg_sentence:.4f}\n"
-    report += f"   - Normalize the Abstract to Content Ratio by dividing it by 20: {calculations['abstract_content_ratio']:.2f} ÷ 20 = {normalized_abstract_ratio:.4f}\n"
-    report += f"   - Multiply the normalized Word Count by 0.3: {normalized_word_count:.4f} × 0.3 = {normalized_word_count * 0.3:.4f}\n"
-    report += f"   - Multiply the normalized Average Sentence Length by 0.4: {normalized_avg_sentence:.4f} × 0.4 = {normalized_avg_sentence * 0.4:.4f}\n"
-    report += f"   - Multiply the normalized Abstract to Content Ratio by 0.3: {normalized_abstract_ratio:.4f} × 0.3 = {normalized_abstract_ratio * 0.3:.4f}\n"
-    report += f"   - Sum all three products: {normalized_word_count * 0.3:.4f} + {normalized_avg_sentence * 0.4:.4f} + {normalized_abstract_ratio * 0.3:.4f} = {calculations['complexity_score']:.4f}\n"
-    report += f" - **Final Complexity Score:** **{calculations['complexity_score']:.2f}**\n\n"
-    
-    return report
-
-def generate_latex_document(paper_element):
-    """Generate LaTeX document sections for a paper."""
-    title = paper_element.find('paper_title').text
+    yield "\n\n"
+    yield from iter_summary_header(validation_result['total_papers'])
     
-    # Get authors
-    authors_element = paper_element.find('authors')
-    authors = []
-    for author_element in authors_element.findall('author'):
-        if author_element.text:
-            authors.append(author_element.text)
+    # Process each paper
+    counts = [] if corpus_stats else None
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
+    yield from render_sections(records, workers, chunksize, cache, counts, templates, profiler)
     
-    abstract = paper_element.find('abstract').text
-    content = paper_element.find('content').text
-    biography = paper_element.find('author_biography').text
+    if counts is not None:
+        yield from iter_corpus_report(corpus_statistics(batch_metrics(counts)))
+    if cache is not None:
+        yield from iter_cache_report(cache.hits - hits, cache.misses - misses)
+
+def iter_xml_stream(source, workers=1, chunksize=16, cache=None, corpus_stats=False, templates=None,
+                    profiler=None, max_errors=None, positions=False, duplicates=None):
+    """Process an XML file or file-like object incrementally, generating the report as text chunks."""
+    chunks = xml_stream_chunks(source, workers, chunksize, cache, corpus_stats, templates, profiler,
+                               max_errors, positions, duplicates)
+    return chunks if profiler is None else profiler.track(chunks)
+
+def iter_source_children(source, positional=False, profiler=None):
+    """Parse an XML source incrementally, yielding (child, position) pairs; positions are None unless positional."""
+    if positional:
+        children = iter_positioned_children(source)
+    else:
+        children = ((element, None) for element in iter_root_children(source))
+    if profiler is not None:
+        children = profiler.timed_iter(children, "parse")
+    return children
+
+class ParsedSource:
+    """One incremental pass over an XML source, turning a parse error inside the with block into its report."""
     
-    latex_doc = "## LaTeX Document Generation\n\n"
+    def __init__(self, source, positional=False, profiler=None):
+        self.source = source
+        self.positional = positional
+        self.profiler = profiler
+        self.validation_result = new_validation_report()
+        self.has_children = False
+        self.opened = None
     
-    # Title Page
-    latex_doc += "- **Title Page:**  \n"
-    latex_doc += f"  ```latex\n"
-    latex_doc += f"  \\documentclass{{article}}\n"
-    latex_doc += f"  \\title{{{title}}}\n"
-    latex_doc += f"  \\author{{{' \\and '.join(authors)}}}\n"
-    latex_doc += f"  \\date{{\\today}}\n"
-    latex_doc += f"  \\begin{{document}}\n"
-    latex_doc += f"  \\maketitle\n"
-    latex_doc += f"  ```\n\n"
+    def __enter__(self):
+        # Positions and byte counts need the raw bytes, so paths are opened here
+        if (self.profiler is not None or self.positional) and not hasattr(self.source, 'read'):
+            self.source = self.opened = open(self.source, 'rb')
+        if self.profiler is not None:
+            self.source = CountingReader(self.source, self.profiler)
+        return self
     
-    # Abstract Section
-    latex_doc += "- **Abstract Section:**  \n"
-    latex_doc += f"  ```latex\n"
-    latex_doc += f"  \\begin{{abstract}}\n"
-    latex_doc += f"  {abstract}\n"
-    latex_doc += f"  \\end{{abstract}}\n"
-    latex_doc += f"  ```\n\n"
+    def children(self):
+        """Yield the (child, position) pairs of the root element, noting whether it has any."""
+        for child in iter_source_children(self.source, self.positional, self.profiler):
+            self.has_children = True
+            yield child
     
-    # Main Content Section
-    latex_doc += "- **Main Content Section:**  \n"
-    latex_doc += f"  ```latex\n"
-    latex_doc += f"  \\section{{Introduction}}\n"
+    def __exit__(self, exc_type, error, traceback):
+        if self.opened is not None:
+            self.opened.close()
+        if exc_type is not None and issubclass(exc_type, ET.ParseError):
+            self.validation_result = invalid_format_report(error if self.positional else None)
+            return True
+        return False
+
+def iter_valid_records(children, validation_result, max_errors=None, profiler=None, duplicates=None,
+                       every_valid=False):
+    """Validate (child, position) pairs into validation_result, yielding records until a paper is invalid, or all with every_valid."""
+    invalid_papers = 0
+    for element, position in children:
+        if element.tag != 'paper':
+            continue
+        if profiler is None:
+            record = validate_paper(element, validation_result, position)
+        else:
+            with profiler.stage("validate"):
+                record = validate_paper(element, validation_result, position)
+        if record is not None and duplicates is not None:
+            duplicates.add(record.content, validation_result["total_papers"])
+        
+        if validation_result["valid"] or (every_valid and record is not None):
+            yield record
+        elif record is None and max_errors is not None:
+            invalid_papers += 1
+            if invalid_papers >= max_errors:
+                stop_validation(validation_result, invalid_papers)
+                break
     
-    # Split content into paragraphs and create sections
-    paragraphs = content.split('\n\n')
+    if duplicates is not None:
+        validation_result["near_duplicates"] = duplicates.pairs()
+
+def xml_stream_chunks(source, workers=1, chunksize=16, cache=None, corpus_stats=False, templates=None,
+                      profiler=None, max_errors=None, positions=False, duplicates=None):
+    """Generate the report for an XML file or file-like object incrementally, as text chunks."""
+    if corpus_stats:
+        require_numpy()
+    positional = max_errors is not None or positions
+    counts = [] if corpus_stats else None
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
     
-    for i, paragraph in enumerate(paragraphs):
-        if i == 0:
-            latex_doc += f"  {paragraph}\n\n"
+    with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as spool:
+        with ParsedSource(source, positional, profiler) as parsed:
+            records = iter_valid_records(parsed.children(), parsed.validation_result, max_errors, profiler, duplicates)
+            for section in render_sections(records, workers, chunksize, cache, counts, templates, profiler):
+                spool.write(section)
+        validation_result = parsed.validation_result
+        
+        yield from iter_validation_report(validation_result)
+        
+        # Mirror iter_xml_report, which skips the summary for an empty root element
+        if validation_result["valid"] and parsed.has_children:
+            yield "\n\n"
+            yield from iter_summary_header(validation_result['total_papers'])
+            spool.seek(0)
+            yield from iter(lambda: spool.read(STREAM_CHUNK_SIZE), "")
+            if counts is not None:
+                yield from iter_corpus_report(corpus_statistics(batch_metrics(counts)))
+            if cache is not None:
+                yield from iter_cache_report(cache.hits - hits, cache.misses - misses)
+
+def write_chunks(chunks, sink):
+    """Write text chunks to any object with a write() method, such as a file or io.StringIO."""
+    for chunk in chunks:
+        sink.write(chunk)
+
+def process_xml_data(xml_string, workers=1, chunksize=16, cache=None, corpus_stats=False, templates=None,
+                     profiler=None, max_errors=None, positions=False, duplicates=None):
+    """Process XML data and generate report."""
+    return "".join(iter_xml_report(xml_string, workers, chunksize, cache, corpus_stats, templates, profiler,
+                                   max_errors, positions, duplicates))
+
+def process_xml_stream(source, output=None, workers=1, chunksize=16, cache=None, corpus_stats=False,
+                       templates=None, profiler=None, max_errors=None, positions=False, duplicates=None):
+    """Process an XML file or file-like object incrementally, returning the report or writing it to output."""
+    chunks = iter_xml_stream(source, workers, chunksize, cache, corpus_stats, templates, profiler,
+                             max_errors, positions, duplicates)
+    if output is None:
+        return "".join(chunks)
+    write_chunks(chunks, output)
+
+class ResultStore:
+    """Memory-mapped random access to the per-paper output of a run, numbered from 1."""
+    
+    MAGIC = b"LCDGRS01"
+    # Magic, number of papers, offset of the index
+    HEADER = struct.Struct("<8sQQ")
+    # Offset of the paper's data, then the lengths of its calculations, detailed report and LaTeX
+    ENTRY = struct.Struct("<QIII")
+    PARTS = ("calculations", "detailed_report", "latex_document")
+    
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as store:
+            self.map = mmap.mmap(store.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < self.HEADER.size:
+            self.map.close()
+            raise ValueError(f"{path} is not a result store")
+        magic, self.papers, self.index_offset = self.HEADER.unpack_from(self.map)
+        if magic != self.MAGIC or self.index_offset + self.papers * self.ENTRY.size > len(self.map):
+            self.map.close()
+            raise ValueError(f"{path} is not a result store")
+    
+    def __len__(self):
+        return self.papers
+    
+    def get(self, number, part="detailed_report"):
+        """Return one part of a paper's output; calculations are returned as a dict."""
+        if not 1 <= number <= self.papers:
+            raise IndexError(f"Paper {number} is not in the store, which holds {self.papers} papers")
+        offset, *lengths = self.ENTRY.unpack_from(self.map, self.index_offset + (number - 1) * self.ENTRY.size)
+        index = self.PARTS.index(part)
+        start = offset + sum(lengths[:index])
+        data = self.map[start:start + lengths[index]].decode('utf-8')
+        return json.loads(data) if part == "calculations" else data
+    
+    def paper(self, number):
+        """Return all of a paper's output as a dict keyed by PARTS."""
+        return {part: self.get(number, part) for part in self.PARTS}
+    
+    def section(self, number):
+        """Return a paper's section exactly as it appears in the markdown report."""
+        return self.get(number, "detailed_report") + "---\n\n" + self.get(number, "latex_document")
+    
+    def close(self):
+        """Unmap the store file."""
+        self.map.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+class ResultStoreWriter:
+    """Writes per-paper output to a temporary file that close() indexes and moves into place."""
+    
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        # Create the temporary file with the mode open() would give the store, instead of a private one
+        while True:
+            self.name = os.path.join(directory, f".result-store-{os.urandom(8).hex()}")
+            try:
+                descriptor = os.open(self.name, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0),
+                                     0o666)
+                break
+            except FileExistsError:
+                continue
+        self.file = os.fdopen(descriptor, 'wb')
+        self.file.write(ResultStore.HEADER.pack(ResultStore.MAGIC, 0, 0))
+        self.offset = ResultStore.HEADER.size
+        self.index = bytearray()
+        self.papers = 0
+    
+    def add(self, calculations, detailed, latex):
+        """Append the output of the next paper."""
+        parts = [json.dumps(calculations).encode('utf-8'), detailed.encode('utf-8'), latex.encode('utf-8')]
+        self.index += ResultStore.ENTRY.pack(self.offset, *(len(part) for part in parts))
+        for part in parts:
+            self.file.write(part)
+            self.offset += len(part)
+        self.papers += 1
+    
+    def close(self):
+        """Write the index and header and move the finished store to its path."""
+        if self.file.closed:
+            return
+        self.file.write(self.index)
+        self.file.seek(0)
+        self.file.write(ResultStore.HEADER.pack(ResultStore.MAGIC, self.papers, self.offset))
+        self.file.close()
+        os.replace(self.name, self.path)
+    
+    def discard(self):
+        """Drop the store without replacing anything at its path."""
+        if not self.file.closed:
+            self.file.close()
+            os.remove(self.name)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
         else:
-            section_name = f"Section {i}"
-            latex_doc += f"  \\section{{{section_name}}}\n"
-            latex_doc += f"  {paragraph}\n\n"
+            self.discard()
+
+def write_result_store(source, path, workers=1, chunksize=16, cache=None, templates=None, max_errors=None,
+                       positions=False):
+    """Process an XML source into a ResultStore at path if every paper is valid, returning the validation report."""
+    positional = max_errors is not None or positions
+    with ResultStoreWriter(path) as writer:
+        with ParsedSource(source, positional) as parsed:
+            records = iter_valid_records(parsed.children(), parsed.validation_result, max_errors)
+            for rendered in render_papers(records, workers, chunksize, cache, templates):
+                writer.add(*rendered)
+        if not parsed.validation_result["valid"]:
+            writer.discard()
+    return parsed.validation_result
+
+def render_paper_tex(paper, number, templates=None):
+    """Render a paper as a standalone .tex fragment for a proceedings project."""
+    templates = templates or DEFAULT_TEMPLATES
+    context = latex_fields_context(paper, templates.math)
+    # Pretty-printed XML breaks titles over lines, which would end the % comment early
+    context["title"] = " ".join(context["title"].split())
+    context["number"] = number
+    context["body"] = render_latex_body(context["content"], templates, templates.tex_introduction, templates.tex_section)
+    return templates.tex_paper(context)
+
+class TexProjectWriter:
+    """Writes a sharded .tex proceedings project, rewriting only changed files in atomic batches."""
     
-    latex_doc += f"  ```\n\n"
+    MANIFEST = "manifest.json"
+    MASTER = "proceedings.tex"
     
-    # Author Biography Section
-    latex_doc += "- **Author Biography Section:**  \n"
-    latex_doc += f"  ```latex\n"
-    latex_doc += f"  \\section{{Author Biography}}\n"
-    latex_doc += f"  {biography}\n\n"
-    latex_doc += f"  \\end{{document}}\n"
-    latex_doc += f"  ```\n\n"
+    def __init__(self, directory, shard_size=1000, batch_bytes=4 * 1024 * 1024, templates=None):
+        self.directory = directory
+        self.shard_size = shard_size
+        self.batch_bytes = batch_bytes
+        self.templates = templates or DEFAULT_TEMPLATES
+        try:
+            with open(os.path.join(directory, self.MANIFEST), encoding='utf-8') as manifest:
+                self.previous = json.load(manifest)["files"]
+        except (OSError, ValueError, KeyError):
+            self.previous = {}
+        self.files = {}
+        # [digest, size, mtime_ns] of every file written or found unchanged by this run
+        self.entries = {}
+        self.pending = []
+        self.pending_bytes = 0
+        self.written = 0
+        self.unchanged = 0
+    
+    def paper_path(self, number):
+        """Path of a paper's file relative to the project directory, with / separators."""
+        return f"papers/{(number - 1) // self.shard_size:04d}/paper-{number:06d}.tex"
     
-    return latex_doc
+    def add_file(self, path, text, digest=None):
+        """Queue a file for writing unless its content is unchanged, returning the content's SHA-256."""
+        data = text.encode('utf-8')
+        digest = digest or hashlib.sha256(data).hexdigest()
+        self.files[path] = digest
+        previous = self.previous.get(path)
+        if isinstance(previous, list) and previous[0] == digest and self.on_disk(path, previous):
+            self.entries[path] = previous
+            self.unchanged += 1
+            return digest
+        self.pending.append((path, data))
+        self.pending_bytes += len(data)
+        if self.pending_bytes >= self.batch_bytes:
+            self.flush()
+        return digest
+    
+    def on_disk(self, path, entry):
+        """Whether the file at path is still the one described by its manifest entry."""
+        try:
+            stat = os.stat(os.path.join(self.directory, path))
+        except OSError:
+            return False
+        return [stat.st_size, stat.st_mtime_ns] == entry[1:]
+    
+    def add(self, number, paper):
+        """Render a paper element or record as paper number and queue its file."""
+        self.add_file(self.paper_path(number), render_paper_tex(paper, number, self.templates))
+    
+    def flush(self):
+        """Write the queued files, each through a temporary file that is renamed into place."""
+        for path, data in self.pending:
+            target = os.path.join(self.directory, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            temporary = f"{target}.{os.getpid()}.tmp"
+            with open(temporary, 'wb') as output:
+                output.write(data)
+            os.replace(temporary, target)
+            stat = os.stat(target)
+            self.entries[path] = [self.files[path], stat.st_size, stat.st_mtime_ns]
+        self.written += len(self.pending)
+        self.pending = []
+        self.pending_bytes = 0
+    
+    def close(self, title="Conference Proceedings"):
+        """Write the master file and manifest, remove stale papers and return the file counts."""
+        papers = sorted(path for path in self.files if path.startswith("papers/"))
+        inputs = "".join(f"\\input{{{path[:-len('.tex')]}}}\n" for path in papers)
+        context = {"title": escape_latex(title, self.templates.math), "inputs": inputs}
+        self.add_file(self.MASTER, self.templates.tex_proceedings(context))
+        self.flush()
+        
+        removed = 0
+        for path in sorted(set(self.previous) - set(self.files)):
+            target = os.path.join(self.directory, path)
+            try:
+                os.remove(target)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            # Drop shard directories that are now empty
+            try:
+                os.rmdir(os.path.dirname(target))
+            except OSError:
+                pass
+        
+        # The manifest goes last, so it never lists a file that was not written
+        self.write_manifest(self.entries)
+        return {"papers": len(papers), "written": self.written, "unchanged": self.unchanged, "removed": removed}
+    
+    def abort(self):
+        """Give up on the run, recording in the manifest the files that batches already replaced."""
+        self.pending = []
+        self.pending_bytes = 0
+        if self.written:
+            self.write_manifest(dict(self.previous, **self.entries))
+    
+    def write_manifest(self, entries):
+        """Atomically replace the manifest with the given entries."""
+        if not os.path.isdir(self.directory):
+            return
+        manifest = os.path.join(self.directory, self.MANIFEST)
+        with open(f"{manifest}.{os.getpid()}.tmp", 'w', encoding='utf-8') as output:
+            output.write(json.dumps({"generator_version": GENERATOR_VERSION, "files": entries}, sort_keys=True))
+        os.replace(f"{manifest}.{os.getpid()}.tmp", manifest)
 
-def process_xml_data(xml_string):
-    """Process XML data and generate report."""
-    validation_result, root = validate_xml_data(xml_string)
+def write_tex_project(source, directory, title="Conference Proceedings", templates=None, shard_size=1000,
+                      max_errors=None, positions=False):
+    """Process an XML source into a .tex project directory, returning the validation report and file counts."""
+    positional = max_errors is not None or positions
+    writer = TexProjectWriter(directory, shard_size, templates=templates)
+    with ParsedSource(source, positional) as parsed:
+        records = iter_valid_records(parsed.children(), parsed.validation_result, max_errors)
+        for number, record in enumerate(records, 1):
+            writer.add(number, record)
+    validation_result = parsed.validation_result
+    if not validation_result["valid"]:
+        writer.abort()
+        return validation_result, None
+    return validation_result, writer.close(title)
+
+def iter_tex_project_report(counts, directory):
+    """Generate a markdown summary of a written .tex project as text chunks."""
+    yield "## TeX Project\n\n"
+    yield f"- **Master File:** {os.path.join(directory, TexProjectWriter.MASTER)}\n"
+    yield f"- **Papers:** {counts['papers']}\n"
+    yield f"- **Files Written:** {counts['written']}\n"
+    yield f"- **Files Unchanged:** {counts['unchanged']}\n"
+    yield f"- **Files Removed:** {counts['removed']}\n"
+
+def generate_tex_project_report(counts, directory):
+    """Generate a markdown summary of a written .tex project."""
+    return "".join(iter_tex_project_report(counts, directory))
+
+class ProceedingsWatcher:
+    """Keeps the outputs of one proceedings file up to date, re-rendering only the papers that change."""
     
-    # Generate validation report
-    validation_report = generate_validation_report(validation_result)
+    def __init__(self, path, report_path, tex_directory=None, workers=1, chunksize=16, templates=None,
+                 title="Conference Proceedings"):
+        self.path = path
+        self.report_path = report_path
+        self.tex_directory = tex_directory
+        self.workers = workers
+        self.chunksize = chunksize
+        self.templates = templates
+        self.title = title
+        self.signature = None
+        self.sections = {}
+        self.tex = {}
+    
+    def changed(self):
+        """Whether the file was modified (or created) since the last check."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        return True
     
-    # If validation failed, return only the validation report
-    if not validation_result["valid"] or not root:
-        return validation_report
+    def refresh(self):
+        """Regenerate the outputs, returning the validation report and the numbers of papers and rendered papers."""
+        # The whole file is parsed at once: the C parser is faster than iterparse and
+        # the papers are kept in memory anyway
+        with open(self.path, 'rb') as source:
+            validation_result, records = validate_xml_data(source.read())
+        valid = validation_result["valid"] and records is not None
+        records = records if valid else []
+        
+        # Render only the papers that are not warm yet; a few papers render faster in-process
+        misses = [record for record in dict.fromkeys(records) if record not in self.sections]
+        workers = self.workers if len(misses) >= self.workers * self.chunksize else 1
+        fresh = render_sections(misses, workers, self.chunksize, templates=self.templates)
+        sections = dict(zip(misses, (section.encode('utf-8') for section in fresh)))
+        if valid:
+            self.sections = {record: self.sections.get(record) or sections[record] for record in records}
+        
+        header = generate_validation_report(validation_result)
+        if valid:
+            header += "\n\n" + "".join(iter_summary_header(validation_result['total_papers']))
+        temporary = f"{self.report_path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as output:
+            output.write(header.encode('utf-8'))
+            output.writelines(self.sections[record] for record in records)
+        os.replace(temporary, self.report_path)
+        
+        if valid and self.tex_directory is not None:
+            writer = TexProjectWriter(self.tex_directory, templates=self.templates)
+            tex = {}
+            for number, record in enumerate(records, 1):
+                key = (number, record)
+                text, digest = self.tex.get(key) or (render_paper_tex(record, number, self.templates), None)
+                tex[key] = (text, writer.add_file(writer.paper_path(number), text, digest))
+            writer.close(self.title)
+            self.tex = tex
+        
+        return validation_result, len(records), len(misses)
+
+def iter_watched_files(inputs):
+    """Yield the XML files to watch: each input file, and the .xml files directly inside each input directory."""
+    for path in inputs:
+        if os.path.isdir(path):
+            for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+                if entry.name.endswith('.xml') and entry.is_file():
+                    yield entry.path
+        else:
+            yield path
+
+def watch_proceedings(inputs, output_directory, interval=0.5, workers=1, chunksize=16, templates=None,
+                      title="Conference Proceedings", polls=None):
+    """Poll proceedings files or directories and regenerate their outputs whenever they change."""
+    os.makedirs(output_directory, exist_ok=True)
+    watchers = {}
+    poll = 0
+    while polls is None or poll < polls:
+        poll += 1
+        for path in iter_watched_files(inputs):
+            watcher = watchers.get(path)
+            if watcher is None:
+                name = os.path.splitext(os.path.basename(path))[0]
+                watcher = watchers[path] = ProceedingsWatcher(
+                    path, os.path.join(output_directory, f"{name}.md"), os.path.join(output_directory, name),
+                    workers, chunksize, templates, title)
+            if not watcher.changed():
+                continue
+            start = time.perf_counter()
+            validation_result, papers, rendered = watcher.refresh()
+            elapsed = (time.perf_counter() - start) * 1000
+            if validation_result["valid"]:
+                print(f"{path}: {rendered} of {papers} papers regenerated in {elapsed:.0f} ms", flush=True)
+            else:
+                print(f"{path}: validation failed, see {watcher.report_path}", flush=True)
+        if polls is None or poll < polls:
+            time.sleep(interval)
+
+def parse_address(address):
+    """Split a service address, "HOST:PORT" or "unix:PATH", into (host, port, path)."""
+    if address.startswith("unix:"):
+        return None, None, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port), None
+
+def parse_http_head(head):
+    """Split an HTTP request or response head into its start line fields and lowercased headers."""
+    start_line, *header_lines = head.decode('latin-1').split("\r\n")
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        if name:
+            headers[name.strip().lower()] = value.strip()
+    return start_line.split(" ", 2), headers
+
+class DocumentService:
+    """Asyncio HTTP service that streams the report for XML proceedings POSTed to /report."""
     
-    # Start building the final report
-    final_report = "# LaTeX Conference Document Summary\n\n"
-    final_report += f"**Total Papers Processed:** {validation_result['total_papers']}\n\n"
-    final_report += "---\n\n"
-    final_report += "## Detailed Analysis per Paper\n\n"
+    REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               408: "Request Timeout", 411: "Length Required", 413: "Payload Too Large",
+               500: "Internal Server Error", 503: "Service Unavailable"}
+    # Seconds spent draining the unread body of a rejected request, so closing does not reset the connection
+    LINGER_TIMEOUT = 2
     
-    # Process each paper
-    for paper_element in root.findall('paper'):
-        # Perform calculations
-        calculations = perform_calculations(paper_element)
+    def __init__(self, workers=None, max_in_flight=None, window=16, max_requests=64,
+                 max_body_bytes=64 * 1024 * 1024, templates=None, max_errors=None, positions=False, timeout=30):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.workers * 4
+        self.window = window
+        self.max_requests = max_requests
+        self.max_body_bytes = max_body_bytes
+        self.timeout = timeout
+        self.render = render_paper if templates is None else functools.partial(render_paper, templates=templates)
+        self.validate = functools.partial(validate_xml_data, max_errors=max_errors, positions=positions)
+        self.active = 0
+        self.rejected = 0
+        self.executor = None
+        self.slots = None
+        self.server = None
+    
+    async def start(self, host="127.0.0.1", port=8080, path=None):
+        """Start listening on a TCP host and port, or on a Unix socket when path is given."""
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        # Start the workers before accepting connections, so forked workers never hold client sockets open
+        await asyncio.get_running_loop().run_in_executor(self.executor, int)
+        self.slots = asyncio.Semaphore(self.max_in_flight)
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+    
+    @property
+    def address(self):
+        """The bound socket address, e.g. (host, port) for TCP."""
+        return self.server.sockets[0].getsockname()
+    
+    async def serve_forever(self):
+        """Serve requests until cancelled, then shut the service down."""
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+    
+    async def close(self):
+        """Stop accepting connections and shut down the worker processes."""
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+    
+    async def handle(self, reader, writer):
+        """Serve a single HTTP request on a new connection."""
+        try:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.timeout)
+            except asyncio.LimitOverrunError:
+                await self.respond(writer, 400, "Request header too large\n")
+                return
+            except asyncio.TimeoutError:
+                await self.respond(writer, 408, "Request header not received in time\n")
+                return
+            start_line, headers = parse_http_head(head[:-4])
+            if len(start_line) < 2:
+                await self.respond(writer, 400, "Malformed request line\n")
+                return
+            method, target = start_line[:2]
+            if target != "/report":
+                await self.respond(writer, 404, "Submit proceedings with POST /report\n")
+                return
+            if method != "POST":
+                await self.respond(writer, 405, "Submit proceedings with POST /report\n")
+                return
+            if not headers.get("content-length", "").isdigit():
+                await self.respond(writer, 411, "Content-Length is required\n")
+                return
+            length = int(headers["content-length"])
+            if length > self.max_body_bytes:
+                await self.respond(writer, 413, f"Submissions are limited to {self.max_body_bytes} bytes\n")
+                await self.discard(reader, length)
+                return
+            
+            # Shed load before the body is read, so at most max_requests bodies are ever buffered
+            if self.active >= self.max_requests:
+                self.rejected += 1
+                await self.respond(writer, 503, "Too many submissions in progress, retry shortly\n",
+                                   "Retry-After: 1\r\n")
+                await self.discard(reader, length)
+                return
+            self.active += 1
+            try:
+                try:
+                    xml_data = await asyncio.wait_for(reader.readexactly(length), self.timeout)
+                except asyncio.TimeoutError:
+                    await self.respond(writer, 408, "Request body not received in time\n")
+                    return
+                await self.stream_report(xml_data, writer)
+            finally:
+                self.active -= 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # The client went away; nothing left to answer
+            pass
+        finally:
+            writer.close()
+    
+    async def respond(self, writer, status, text, extra_headers=""):
+        """Send a complete plain-text response."""
+        body = text.encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {self.REASONS[status]}\r\nContent-Type: text/plain; charset=utf-8\r\n"
+                     f"Content-Length: {len(body)}\r\n{extra_headers}Connection: close\r\n\r\n".encode('latin-1') + body)
+        await writer.drain()
+    
+    async def discard(self, reader, length):
+        """Read and drop the unread body of a rejected request for up to LINGER_TIMEOUT seconds."""
+        async def drain_body(remaining):
+            while remaining > 0:
+                data = await reader.read(min(remaining, STREAM_CHUNK_SIZE))
+                if not data:
+                    return
+                remaining -= len(data)
         
-        # Generate detailed report
-        paper_report = generate_detailed_report(paper_element, calculations)
-        final_report += paper_report
+        try:
+            await asyncio.wait_for(drain_body(length), self.LINGER_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def stream_report(self, xml_data, writer):
+        """Generate the report for one submission, streaming it to the client as it is produced."""
+        loop = asyncio.get_running_loop()
+        
+        async def send(text):
+            data = text.encode('utf-8')
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            # Backpressure: wait here while the client reads slower than papers render
+            await writer.drain()
+        
+        async def send_section(future):
+            calculations, detailed, latex = await future
+            await send(detailed + "---\n\n" + latex)
+        
+        # Parsing and validation run in a worker too; only the records come back
+        try:
+            validation_result, records = await loop.run_in_executor(self.executor, self.validate, xml_data)
+        except Exception as error:
+            await self.respond(writer, 500, f"ERROR: Validation failed: {type(error).__name__}: {error}\n")
+            return
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/markdown; charset=utf-8\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        await send(generate_validation_report(validation_result))
         
-        # Generate LaTeX document
-        latex_doc = generate_latex_document(paper_element)
-        final_report += "---\n\n"
-        final_report += latex_doc
+        if validation_result["valid"] and records is not None:
+            await send("\n\n" + "".join(iter_summary_header(validation_result['total_papers'])))
+            pending = deque()
+            try:
+                for record in records:
+                    if len(pending) >= self.window:
+                        await send_section(pending.popleft())
+                    await self.slots.acquire()
+                    future = loop.run_in_executor(self.executor, self.render, record)
+                    future.add_done_callback(lambda _: self.slots.release())
+                    pending.append(future)
+                while pending:
+                    await send_section(pending.popleft())
+            except ConnectionError:
+                raise
+            except Exception as error:
+                # The status line is already sent, so end the report with the error instead of leaving it unterminated
+                await send(f"\nERROR: Rendering failed: {type(error).__name__}: {error}\n")
+            finally:
+                # Papers of an abandoned request that have not started are dropped
+                for future in pending:
+                    future.cancel()
+        
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+async def submit_report(xml_data, host="127.0.0.1", port=8080, path=None, on_chunk=None):
+    """Submit XML proceedings to a DocumentService, returning (status, response text)."""
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    if isinstance(xml_data, str):
+        xml_data = xml_data.encode('utf-8')
     
-    return validation_report + "\n\n" + final_report
+    try:
+        writer.write(f"POST /report HTTP/1.1\r\nHost: {host or 'localhost'}\r\nContent-Type: application/xml\r\n"
+                     f"Content-Length: {len(xml_data)}\r\nConnection: close\r\n\r\n".encode('latin-1') + xml_data)
+        await writer.drain()
+        
+        (_, status, *_), headers = parse_http_head((await reader.readuntil(b"\r\n\r\n"))[:-4])
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        parts = []
+        if headers.get("transfer-encoding") == "chunked":
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                parts.append(decoder.decode((await reader.readexactly(size + 2))[:-2]))
+                if on_chunk is not None:
+                    on_chunk(parts[-1])
+        else:
+            parts.append(decoder.decode(await reader.readexactly(int(headers.get("content-length", 0))), True))
+        return int(status), "".join(parts)
+    finally:
+        writer.close()
 
-def main():
-    """Main function to demonstrate the script's functionality."""
-    # Example XML data
-    example_xml = """
+def synthetic_vocabulary(rng, size=5000):
+    """Generate a vocabulary of random lowercase words that starts with the stopwords."""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulary = [''.join(rng.choice(letters) for _ in range(rng.randint(2, 12))) for _ in range(size)]
+    vocabulary[:len(STOPWORDS)] = sorted(STOPWORDS)
+    return vocabulary
+
+def synthetic_text(rng, word_count, vocabulary=None, distinct=False):
+    """Generate prose-like text with a skewed word distribution, or of distinct words when distinct is set."""
+    if distinct:
+        vocabulary = synthetic_vocabulary(rng, word_count)
+    elif vocabulary is None:
+        vocabulary = synthetic_vocabulary(rng)
+    words = []
+    for i in range(word_count):
+        if distinct:
+            word = vocabulary[i]
+        else:
+            word = vocabulary[min(int(rng.expovariate(1 / 400)), len(vocabulary) - 1)]
+        if i % 15 == 0:
+            word = word.capitalize()
+        roll = rng.random()
+        if roll < 0.06:
+            word += '.'
+        elif roll < 0.1:
+            word += ','
+        elif roll < 0.102:
+            word += '\n\n'
+        words.append(word)
+    return ' '.join(words) + '.'
+
+def synthetic_proceedings(papers=100, content_words=500, authors=2, invalid_rate=0.0, seed=0):
+    """Generate a reproducible XML proceedings corpus, breaking a fraction invalid_rate of the papers."""
+    rng = random.Random(seed)
+    vocabulary = synthetic_vocabulary(rng)
+    
+    def name():
+        return f"{rng.choice(vocabulary).capitalize()} {rng.choice(vocabulary).capitalize()}"
+    
+    parts = ["<papers>\n"]
+    for _ in range(papers):
+        fields = {
+            "paper_title": synthetic_text(rng, rng.randint(4, 10), vocabulary).rstrip('.'),
+            "authors": "".join(f"<author>{name()}</author>" for _ in range(authors)),
+            "abstract": synthetic_text(rng, max(content_words // 10, 5), vocabulary),
+            "content": synthetic_text(rng, content_words, vocabulary),
+            "author_biography": f"{name()} is a researcher. " + synthetic_text(rng, 30, vocabulary)
+        }
+        if rng.random() < invalid_rate:
+            broken = rng.choice(sorted(fields))
+            if rng.random() < 0.5:
+                del fields[broken]
+            else:
+                fields[broken] = ""
+        parts.append("  <paper>\n")
+        for tag, text in fields.items():
+            parts.append(f"    <{tag}>{text}</{tag}>\n")
+        parts.append("  </paper>\n")
+    parts.append("</papers>\n")
+    return "".join(parts)
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+def summarize_timings(seconds, items, sample):
+    """Summarise timed samples (seconds) into throughput in papers/s and latency percentiles."""
+    seconds = sorted(seconds)
+    total = sum(seconds)
+    return {
+        "sample": sample,
+        "samples": len(seconds),
+        "items": items,
+        "total_s": total,
+        "throughput_per_s": items / total if total > 0 else 0.0,
+        "latency_ms": {
+            "mean": total / len(seconds) * 1000 if seconds else 0.0,
+            "p50": percentile(seconds, 50) * 1000,
+            "p90": percentile(seconds, 90) * 1000,
+            "p99": percentile(seconds, 99) * 1000,
+            "max": seconds[-1] * 1000 if seconds else 0.0
+        }
+    }
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def benchmark_pipeline(papers=1000, content_words=500, authors=2, invalid_rate=0.0, repeat=3, seed=0,
+                       workers=1, chunksize=16):
+    """Time each pipeline stage on a synthetic corpus and return machine-readable results."""
+    xml_string = synthetic_proceedings(papers, content_words, authors, invalid_rate, seed)
+    validation_result, valid_papers = validate_xml_data(xml_string)
+    valid_papers = valid_papers or []
+    # process_xml_data stops after the validation report unless every paper is valid
+    rendered_papers = len(valid_papers) if validation_result["valid"] else 0
+    
+    stages = {}
+    
+    def timed(function, *args):
+        start = time.perf_counter()
+        function(*args)
+        return time.perf_counter() - start
+    
+    runs = [timed(validate_xml_data, xml_string) for _ in range(repeat)]
+    stages["validate_xml_data"] = summarize_timings(runs, papers * repeat, "corpus")
+    
+    calculations = [perform_calculations(record) for record in valid_papers]
+    stages["perform_calculations"] = summarize_timings(
+        [timed(perform_calculations, record) for _ in range(repeat) for record in valid_papers],
+        len(valid_papers) * repeat, "paper")
+    stages["generate_detailed_report"] = summarize_timings(
+        [timed(generate_detailed_report, record, calculation)
+         for _ in range(repeat) for record, calculation in zip(valid_papers, calculations)],
+        len(valid_papers) * repeat, "paper")
+    stages["generate_latex_document"] = summarize_timings(
+        [timed(generate_latex_document, record) for _ in range(repeat) for record in valid_papers],
+        len(valid_papers) * repeat, "paper")
+    
+    runs = [timed(process_xml_data, xml_string, workers, chunksize) for _ in range(repeat)]
+    stages["process_xml_data"] = summarize_timings(runs, rendered_papers * repeat, "corpus")
+    
+    return {
+        "generator_version": GENERATOR_VERSION,
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "parameters": {
+            "papers": papers,
+            "content_words": content_words,
+            "authors": authors,
+            "invalid_rate": invalid_rate,
+            "repeat": repeat,
+            "seed": seed,
+            "workers": workers,
+            "chunksize": chunksize
+        },
+        "input_bytes": len(xml_string.encode('utf-8')),
+        "valid_papers": len(valid_papers),
+        "rendered_papers": rendered_papers,
+        "stages": stages,
+        # Generating and holding the synthetic corpus counts towards the peak
+        "peak_rss_bytes_with_corpus": peak_rss_bytes()
+    }
+
+def benchmark_text_stats(word_counts=(1000, 10000, 100000), repeat=5, seed=0):
+    """Compare text_statistics against the per-metric regex scans it replaces, on repeated and distinct words."""
+    def legacy_scan(text):
+        words = re.findall(r'\b\w+\b', text.lower())
+        word_counts = {}
+        for word in words:
+            if word not in STOPWORDS and len(word) > 2:
+                word_counts[word] = word_counts.get(word, 0) + 1
+        return count_words(text), count_characters_no_spaces(text), count_sentences(text), word_counts
+    
+    def fused_scan(text):
+        stats = text_statistics(text, count_terms=True)
+        return stats["words"], stats["characters"], stats["sentences"], stats["terms"]
+    
+    rng = random.Random(seed)
+    results = []
+    for word_count, distinct in itertools.product(word_counts, (False, True)):
+        text = synthetic_text(rng, word_count, distinct=distinct)
+        if legacy_scan(text) != fused_scan(text):
+            raise AssertionError(f"text_statistics disagrees with the legacy scans for {word_count} words")
+        
+        timings = {}
+        for name, scan in (("legacy", legacy_scan), ("fused", fused_scan)):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                scan(text)
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        
+        results.append({
+            "words": word_count,
+            "tokens": "distinct" if distinct else "repeated",
+            "legacy_ms": timings["legacy"] * 1000,
+            "fused_ms": timings["fused"] * 1000,
+            "speedup": timings["legacy"] / timings["fused"]
+        })
+    return results
+
+def benchmark_latex_escaping(word_counts=(1000, 10000, 100000), special_rate=0.02, repeat=5, seed=0):
+    """Compare escape_latex against escaping with chained str.replace calls, on text with and without specials."""
+    def chained_replace(text):
+        # The backslash is parked on NUL so that the braces of later escapes survive
+        text = text.replace('\\', '\0').replace('{', '\\{').replace('}', '\\}')
+        text = text.replace('&', '\\&').replace('%', '\\%').replace('$', '\\$').replace('#', '\\#').replace('_', '\\_')
+        text = text.replace('~', '\\textasciitilde{}').replace('^', '\\textasciicircum{}')
+        text = text.replace('<', '\\textless{}').replace('>', '\\textgreater{}')
+        return text.replace('\0', '\\textbackslash{}')
+    
+    rng = random.Random(seed)
+    specials = ''.join(LATEX_ESCAPES)
+    results = []
+    for word_count, rate in itertools.product(word_counts, (special_rate, 0.0)):
+        words = synthetic_text(rng, word_count).split(' ')
+        text = ' '.join(word + rng.choice(specials) if rng.random() < rate else word for word in words)
+        if escape_latex(text) != chained_replace(text):
+            raise AssertionError(f"escape_latex disagrees with chained replacements for {word_count} words")
+        
+        timings = {}
+        for name, escape in (("chained", chained_replace), ("escape", escape_latex)):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                escape(text)
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        
+        results.append({
+            "words": word_count,
+            "special_rate": rate,
+            "chained_ms": timings["chained"] * 1000,
+            "escape_ms": timings["escape"] * 1000,
+            "speedup": timings["chained"] / timings["escape"]
+        })
+    return results
+
+def benchmark_service(requests=200, concurrency=50, papers=20, content_words=300, authors=2, seed=0,
+                      workers=None, max_in_flight=None, max_requests=64):
+    """Load-test a DocumentService on localhost, checking every report against process_xml_data."""
+    submissions = [synthetic_proceedings(papers, content_words, authors, 0.0, seed + i)
+                   for i in range(min(requests, 8))]
+    expected = [process_xml_data(xml_string) for xml_string in submissions]
+    
+    async def load_test():
+        service = DocumentService(workers, max_in_flight, max_requests=max_requests)
+        await service.start("127.0.0.1", 0)
+        host, port = service.address[:2]
+        latencies, first_bytes = [], []
+        outstanding = iter(range(requests))
+        
+        async def client():
+            for i in outstanding:
+                start = time.perf_counter()
+                first_byte = []
+                
+                def mark_first_byte(_):
+                    if not first_byte:
+                        first_byte.append(time.perf_counter())
+                
+                status, report = await submit_report(submissions[i % len(submissions)], host, port,
+                                                     on_chunk=mark_first_byte)
+                if status == 503:
+                    continue
+                if status != 200 or report != expected[i % len(submissions)]:
+                    raise AssertionError(f"request {i} returned status {status} or an unexpected report")
+                latencies.append(time.perf_counter() - start)
+                first_byte_at, = first_byte
+                first_bytes.append(first_byte_at - start)
+        
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(client() for _ in range(concurrency)))
+        finally:
+            await service.close()
+        return time.perf_counter() - start, latencies, first_bytes, service
+    
+    elapsed, latencies, first_bytes, service = asyncio.run(load_test())
+    return {
+        "config": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "papers_per_request": papers,
+            "content_words": content_words,
+            "workers": service.workers,
+            "max_in_flight": service.max_in_flight,
+            "max_requests": max_requests,
+            "seed": seed
+        },
+        "completed": len(latencies),
+        "rejected": service.rejected,
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": summarize_timings(latencies, len(latencies) * papers, "request")["latency_ms"],
+        "first_byte_ms": summarize_timings(first_bytes, len(first_bytes) * papers, "request")["latency_ms"]
+    }
+
+# Example XML data
+EXAMPLE_XML = """
     <papers>
   <paper>
     <paper_title>Deep Neural Networks for Stock Prediction</paper_title>
@@ -469,10 +2858,249 @@ def main():
   </paper>
 </papers>
     """
+
+def main(argv=None):
+    """Main function to demonstrate the script's functionality."""
+    parser = argparse.ArgumentParser(description="Generate LaTeX conference documents from XML paper data.")
+    parser.add_argument("input", nargs="?",
+                        help="XML proceedings file to process incrementally (runs the built-in example when omitted)")
+    parser.add_argument("-o", "--output", help="write the report to this file instead of standard output")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of worker processes used to render papers (default: 1)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="papers handed to a worker at a time when rendering in parallel (default: 16)")
+    parser.add_argument("--cache", metavar="PATH",
+                        help="reuse calculations and rendered sections of unchanged papers from this cache file")
+    parser.add_argument("--cache-size", type=int, default=256, metavar="MB",
+                        help="maximum size of the render cache in megabytes (default: 256)")
+    parser.add_argument("--corpus-stats", action="store_true",
+                        help="append corpus-wide metric distributions and complexity outliers (requires numpy)")
+    parser.add_argument("--templates", metavar="DIR",
+                        help="render papers with the <name>.tmpl conference templates found in DIR")
+    parser.add_argument("--latex-math", action="store_true",
+                        help="trust $...$, \\(...\\) and \\[...\\] math in the papers and keep it unescaped in LaTeX")
+    parser.add_argument("--keyword", action="append", metavar="WORD",
+                        help="report which papers of the input mention WORD and its density (repeatable)")
+    parser.add_argument("--metric", action="append", metavar="NAME",
+                        help="compute only the metric NAME of every paper of the input (repeatable)")
+    parser.add_argument("--max-errors", type=int, metavar="N",
+                        help="stop validating after N invalid papers; errors then include source positions")
+    parser.add_argument("--fail-fast", action="store_const", const=1, dest="max_errors",
+                        help="stop validating at the first invalid paper (same as --max-errors 1)")
+    parser.add_argument("--positions", action="store_true",
+                        help="include the source line and column in every validation error")
+    parser.add_argument("--duplicates", type=float, nargs="?", const=0.8, metavar="THRESHOLD",
+                        help="flag papers whose content is at least THRESHOLD similar (default: 0.8)")
+    parser.add_argument("--store", metavar="PATH",
+                        help="write each paper's calculations and rendered sections to an indexed result store at PATH "
+                             "instead of the markdown report")
+    parser.add_argument("--tex-project", metavar="DIR",
+                        help="write a .tex file per paper and a master proceedings.tex into DIR instead of the report")
+    parser.add_argument("--tex-title", default="Conference Proceedings",
+                        help="title of the master proceedings file (default: Conference Proceedings)")
+    parser.add_argument("--shard-size", type=int, default=1000, metavar="N",
+                        help="paper files per directory of the .tex project (default: 1000)")
+    parser.add_argument("--watch", metavar="DIR",
+                        help="keep running and regenerate the report and .tex project of the input file(s) in DIR "
+                             "whenever they change; the input may be a directory of XML files")
+    parser.add_argument("--watch-interval", type=float, default=0.5, metavar="SECONDS",
+                        help="how often --watch checks the input for changes (default: 0.5)")
+    parser.add_argument("--query", metavar="STORE", help="print one paper from a result store (see --paper and --part)")
+    parser.add_argument("--paper", type=int, default=1, metavar="N", help="paper number to print with --query (default: 1)")
+    parser.add_argument("--part", choices=["section", "calculations", "detailed_report", "latex_document"],
+                        default="section", help="part of the paper to print with --query (default: section)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write per-stage and per-paper timings and byte counts of the run to PATH")
+    parser.add_argument("--profile-format", choices=["json", "prometheus"], default="json",
+                        help="format of the --profile output (default: json)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also record peak Python memory usage in the profile (slows the run down)")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="run the document service on HOST:PORT or unix:PATH, accepting POST /report")
+    parser.add_argument("--submit", metavar="ADDRESS",
+                        help="send the input file to the document service at ADDRESS and write the streamed report")
+    parser.add_argument("--max-in-flight", type=int, metavar="N",
+                        help="papers the service renders at once across all requests (default: 4 per worker)")
+    parser.add_argument("--max-requests", type=int, default=64, metavar="N",
+                        help="submissions the service handles at once before answering 503 (default: 64)")
+    parser.add_argument("--benchmark", choices=["text-stats", "latex-escape", "pipeline", "service"],
+                        help="run a benchmark instead of generating a report")
+    benchmark = parser.add_argument_group("pipeline and service benchmark options")
+    benchmark.add_argument("--bench-papers", type=int,
+                           help="papers in the synthetic corpus (default: 1000, or 20 per request for the service)")
+    benchmark.add_argument("--bench-content-words", type=int, default=500,
+                           help="words of content per paper (default: 500)")
+    benchmark.add_argument("--bench-authors", type=int, default=2, help="authors per paper (default: 2)")
+    benchmark.add_argument("--bench-invalid-rate", type=float, default=0.0,
+                           help="fraction of papers with a broken required field (default: 0)")
+    benchmark.add_argument("--bench-repeat", type=int, default=3, help="repetitions of every stage (default: 3)")
+    benchmark.add_argument("--bench-seed", type=int, default=0, help="seed of the synthetic corpus (default: 0)")
+    benchmark.add_argument("--bench-requests", type=int, default=200,
+                           help="submissions sent to the service (default: 200)")
+    benchmark.add_argument("--bench-concurrency", type=int, default=50,
+                           help="concurrent clients submitting to the service (default: 50)")
+    args = parser.parse_args(argv)
+    
+    if args.benchmark == "text-stats":
+        print("| Words | Tokens | Legacy (ms) | Fused (ms) | Speedup |")
+        print("|---|---|---|---|---|")
+        for result in benchmark_text_stats():
+            print(f"| {result['words']} | {result['tokens']} | {result['legacy_ms']:.2f} | {result['fused_ms']:.2f} "
+                  f"| {result['speedup']:.1f}x |")
+        return
+    
+    if args.benchmark == "latex-escape":
+        print("| Words | Special Rate | Chained replace (ms) | escape_latex (ms) | Speedup |")
+        print("|---|---|---|---|---|")
+        for result in benchmark_latex_escaping():
+            print(f"| {result['words']} | {result['special_rate']:.0%} | {result['chained_ms']:.2f} | "
+                  f"{result['escape_ms']:.2f} | {result['speedup']:.1f}x |")
+        return
+    
+    if args.benchmark in ("pipeline", "service"):
+        if args.benchmark == "pipeline":
+            results = benchmark_pipeline(args.bench_papers or 1000, args.bench_content_words, args.bench_authors,
+                                         args.bench_invalid_rate, args.bench_repeat, args.bench_seed,
+                                         args.workers, args.chunksize)
+        else:
+            results = benchmark_service(args.bench_requests, args.bench_concurrency, args.bench_papers or 20,
+                                        args.bench_content_words, args.bench_authors, args.bench_seed,
+                                        args.workers, args.max_in_flight, args.max_requests)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2)
+        else:
+            print(json.dumps(results, indent=2))
+        return
+    
+    try:
+        templates = load_template_set(args.templates, args.latex_math) if args.templates else None
+    except ValueError as error:
+        parser.error(str(error))
+    if templates is None and args.latex_math:
+        templates = template_set(math=True)
+    
+    if args.serve:
+        host, port, path = parse_address(args.serve)
+        service = DocumentService(args.workers, args.max_in_flight, max_requests=args.max_requests,
+                                  templates=templates, max_errors=args.max_errors, positions=args.positions)
+        
+        async def serve():
+            await service.start(host, port, path)
+            await service.serve_forever()
+        
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        return
+    
+    if args.submit:
+        if args.input is None:
+            parser.error("--submit requires an input file")
+        host, port, path = parse_address(args.submit)
+        with open(args.input, 'rb') as source:
+            xml_data = source.read()
+        with open(args.output, 'w', encoding='utf-8') if args.output else contextlib.nullcontext(sys.stdout) as output:
+            status, report = asyncio.run(submit_report(xml_data, host, port, path, output.write))
+        if status != 200:
+            sys.exit(f"Service responded with status {status}: {report.strip()}")
+        return
+    
+    if args.query:
+        with ResultStore(args.query) as store:
+            try:
+                if args.part == "section":
+                    print(store.section(args.paper), end="")
+                elif args.part == "calculations":
+                    print(json.dumps(store.get(args.paper, "calculations"), indent=2))
+                else:
+                    print(store.get(args.paper, args.part), end="")
+            except IndexError as error:
+                sys.exit(f"ERROR: {error}")
+        return
+    
+    if args.keyword:
+        if args.input is None:
+            parser.error("--keyword requires an input file")
+        phrases = [keyword for keyword in args.keyword if not WORD_PATTERN.fullmatch(keyword.lower())]
+        if phrases:
+            parser.error(f"--keyword takes single words, got: {', '.join(map(repr, phrases))}")
+        write_chunks(iter_keyword_report(build_term_index(args.input), args.keyword), sys.stdout)
+        return
+    
+    if args.metric:
+        if args.input is None:
+            parser.error("--metric requires an input file")
+        choices = METRICS.reportable()
+        unknown = [name for name in args.metric if name not in choices]
+        if unknown:
+            parser.error(f"unknown metric(s): {', '.join(unknown)}; choose from {', '.join(choices)}")
+        validation_result, metrics = compute_source_metrics(args.input, args.metric)
+        if metrics is None:
+            print(generate_validation_report(validation_result), end="")
+            sys.exit(1)
+        write_chunks(iter_metrics_report(metrics, args.metric), sys.stdout)
+        return
+    
+    if args.watch:
+        if args.input is None:
+            parser.error("--watch requires an input file or directory")
+        try:
+            watch_proceedings([args.input], args.watch, args.watch_interval, args.workers, args.chunksize, templates,
+                              args.tex_title)
+        except KeyboardInterrupt:
+            pass
+        return
+    
+    try:
+        cache = RenderCache(args.cache, args.cache_size * 1024 * 1024) if args.cache else None
+    except (ValueError, sqlite3.OperationalError) as error:
+        sys.exit(f"ERROR: {error}")
+    profiler = PipelineProfiler(args.trace_memory) if args.profile else None
+    duplicates = NearDuplicateIndex(args.duplicates) if args.duplicates is not None else None
+    try:
+        if args.store:
+            # Write per-paper output to an indexed store instead of the markdown report
+            source = args.input if args.input is not None else StringIO(EXAMPLE_XML)
+            validation_result = write_result_store(source, args.store, args.workers, args.chunksize, cache, templates,
+                                                   args.max_errors, args.positions)
+            print(generate_validation_report(validation_result), end="")
+        elif args.tex_project:
+            # Write a compilable LaTeX project, touching only files whose content changed
+            source = args.input if args.input is not None else StringIO(EXAMPLE_XML)
+            validation_result, counts = write_tex_project(source, args.tex_project, args.tex_title, templates,
+                                                          args.shard_size, args.max_errors, args.positions)
+            print(generate_validation_report(validation_result))
+            if counts is not None:
+                write_chunks(iter_tex_project_report(counts, args.tex_project), sys.stdout)
+        elif args.input is not None:
+            # Stream a proceedings file straight through without loading it into memory
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as output:
+                    process_xml_stream(args.input, output, args.workers, args.chunksize, cache,
+                                       args.corpus_stats, templates, profiler, args.max_errors, args.positions,
+                                       duplicates)
+            else:
+                process_xml_stream(args.input, sys.stdout, args.workers, args.chunksize, cache,
+                                   args.corpus_stats, templates, profiler, args.max_errors, args.positions,
+                                   duplicates)
+        else:
+            # Process the example XML data
+            report = process_xml_data(EXAMPLE_XML, args.workers, args.chunksize, cache, args.corpus_stats,
+                                      templates, profiler, args.max_errors, args.positions, duplicates)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as output:
+                    output.write(report)
+            else:
+                print(report)
+    finally:
+        if cache is not None:
+            cache.close()
     
-    # Process the XML data
-    report = process_xml_data(example_xml)
-    print(report)
+    if profiler is not None:
+        with open(args.profile, 'w', encoding='utf-8') as output:
+            output.write(profiler.to_json() if args.profile_format == "json" else profiler.to_prometheus())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
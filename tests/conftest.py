@@ -0,0 +1,23 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+MODULE_PATH = pathlib.Path(__file__).resolve().parent.parent / "LaTeXConferenceDocGen-AI.py"
+
+
+def load_module():
+    """Import the generator script, whose file name is not a valid module name."""
+    if "docgen" not in sys.modules:
+        spec = importlib.util.spec_from_file_location("docgen", MODULE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        # Registered before executing, so worker processes can pickle its functions
+        sys.modules["docgen"] = module
+        spec.loader.exec_module(module)
+    return sys.modules["docgen"]
+
+
+@pytest.fixture(scope="session")
+def docgen():
+    return load_module()
@@ -0,0 +1,53 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture(scope="module")
+def records(docgen):
+    corpus = docgen.synthetic_proceedings(papers=60, content_words=120, seed=3)
+    return docgen.validate_xml_data(corpus)[1]
+
+
+def test_batch_metrics_match_perform_calculations(docgen, records):
+    metrics = docgen.collect_batch_metrics(records)
+    for index, record in enumerate(records):
+        calculations = docgen.perform_calculations(record)
+        for name, values in metrics.items():
+            assert values[index] == pytest.approx(calculations[name], rel=1e-12, abs=1e-12), name
+
+
+def test_zero_denominators_give_zero(docgen):
+    metrics = docgen.batch_metrics([(0, 0, 0, 0, 0, 0)])
+    for name in ("abstract_content_ratio", "avg_word_length", "avg_sentence_length", "keyword_density"):
+        assert metrics[name][0] == 0
+
+
+def test_corpus_statistics_summarise_each_metric(docgen, records):
+    metrics = docgen.collect_batch_metrics(records)
+    statistics = docgen.corpus_statistics(metrics, percentiles=(50,))
+    assert statistics["total_papers"] == len(records)
+    assert set(statistics["metrics"]) == set(docgen.CORPUS_METRICS)
+    words = metrics["total_word_count"]
+    summary = statistics["metrics"]["total_word_count"]
+    assert (summary["mean"], summary["min"], summary["max"]) == (words.mean(), words.min(), words.max())
+    assert summary["percentiles"] == [float(np.median(words))]
+
+
+def test_complexity_outliers_are_reported_by_position(docgen):
+    counts = [(10, 100, 500, 1, 5, 3)] * 20 + [(900, 100, 5000, 1, 1, 3)]
+    statistics = docgen.corpus_statistics(docgen.batch_metrics(counts))
+    assert [index for index, _ in statistics["outliers"]] == [21]
+
+
+def test_empty_corpus(docgen):
+    statistics = docgen.corpus_statistics(docgen.batch_metrics([]))
+    assert statistics["total_papers"] == 0
+    assert statistics["metrics"] == {}
+
+
+def test_corpus_report_section(docgen):
+    report = docgen.process_xml_data(docgen.EXAMPLE_XML, corpus_stats=True)
+    assert report.startswith(docgen.process_xml_data(docgen.EXAMPLE_XML))
+    assert "## Corpus Statistics" in report
+    assert "**Papers Analysed:** 4" in report
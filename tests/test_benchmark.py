@@ -0,0 +1,38 @@
+import json
+
+
+def test_percentile_is_nearest_rank(docgen):
+    values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert docgen.percentile(values, 50) == 5
+    assert docgen.percentile(values, 90) == 9
+    assert docgen.percentile(values, 0) == 1
+    assert docgen.percentile([], 50) == 0.0
+
+
+def test_summarize_timings(docgen):
+    summary = docgen.summarize_timings([0.3, 0.1, 0.2], 6, "paper")
+    assert summary["samples"] == 3
+    assert summary["throughput_per_s"] == 6 / (0.1 + 0.2 + 0.3)
+    assert summary["latency_ms"]["max"] == 300
+    assert docgen.summarize_timings([], 0, "paper")["throughput_per_s"] == 0.0
+
+
+def test_pipeline_benchmark_on_a_valid_corpus(docgen):
+    results = docgen.benchmark_pipeline(papers=6, content_words=40, repeat=2)
+    json.dumps(results)
+    assert results["valid_papers"] == results["rendered_papers"] == 6
+    stages = results["stages"]
+    assert stages["process_xml_data"]["items"] == 12
+    assert stages["perform_calculations"]["samples"] == 12
+    assert all(stage["throughput_per_s"] > 0 for stage in stages.values())
+    assert "peak_rss_bytes_with_corpus" in results
+
+
+def test_pipeline_benchmark_counts_only_rendered_papers(docgen):
+    results = docgen.benchmark_pipeline(papers=20, content_words=40, invalid_rate=0.3, repeat=1, seed=2)
+    assert 0 < results["valid_papers"] < 20
+    # An invalid corpus only gets its validation report, so no papers are rendered end to end
+    assert results["rendered_papers"] == 0
+    assert results["stages"]["process_xml_data"]["throughput_per_s"] == 0.0
+    assert results["stages"]["validate_xml_data"]["items"] == 20
+    assert results["stages"]["perform_calculations"]["items"] == results["valid_papers"]
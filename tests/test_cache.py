@@ -0,0 +1,113 @@
+import os
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def corpus(docgen):
+    return docgen.synthetic_proceedings(papers=40, content_words=80, seed=1)
+
+
+@pytest.fixture(scope="module")
+def uncached_report(docgen, corpus):
+    return docgen.process_xml_data(corpus)
+
+
+@pytest.fixture
+def quick_locks(docgen, monkeypatch):
+    monkeypatch.setattr(docgen.RenderCache, "LOCK_TIMEOUT", 0.05)
+    monkeypatch.setattr(docgen.RenderCache, "COMMIT_EVERY", 2)
+
+
+def rendered(number):
+    return {"total_word_count": number}, f"detailed {number}", f"latex {number}"
+
+
+def test_cached_report_matches_uncached(docgen, corpus, uncached_report, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with docgen.RenderCache(path) as cache:
+        report = docgen.process_xml_data(corpus, cache=cache)
+        assert report == uncached_report + docgen.generate_cache_report(0, 40)
+    with docgen.RenderCache(path) as cache:
+        report = docgen.process_xml_data(corpus, workers=2, cache=cache)
+        assert report == uncached_report + docgen.generate_cache_report(40, 0)
+
+
+def test_cache_evicts_to_its_budget(docgen, corpus, uncached_report, tmp_path):
+    with docgen.RenderCache(str(tmp_path / "cache.sqlite"), max_entries=5) as cache:
+        report = docgen.process_xml_data(corpus, cache=cache)
+        assert report == uncached_report + docgen.generate_cache_report(0, 40)
+        assert cache.entries <= 5
+
+
+def test_cache_keys_change_with_the_paper_and_templates(docgen):
+    record = docgen.PaperRecord("Title", ("Author",), "Abstract.", "Content.", "Bio.")
+    key = docgen.paper_cache_key(record)
+    assert docgen.paper_cache_key(record._replace(content="Other.")) != key
+    assert docgen.paper_cache_key(record, docgen.template_set({"latex_section": "{paragraph}"})) != key
+    assert docgen.paper_cache_key(record) == key
+
+
+def test_cache_refuses_foreign_files(docgen, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"not a cache")
+    with pytest.raises(ValueError):
+        docgen.RenderCache(str(path))
+    assert path.read_bytes() == b"not a cache"
+
+
+def test_cache_refuses_other_sqlite_files(docgen, tmp_path):
+    path = str(tmp_path / "other.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE entries (key TEXT)")
+    connection.commit()
+    connection.close()
+    size = os.path.getsize(path)
+    with pytest.raises(ValueError):
+        docgen.RenderCache(path)
+    assert os.path.getsize(path) == size
+
+
+def test_writes_are_committed_in_batches(docgen, quick_locks, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = docgen.RenderCache(path)
+    for number in range(5):
+        cache.put(f"key{number}", *rendered(number))
+    # A killed run keeps every finished batch
+    with docgen.RenderCache(path) as other:
+        assert other.entries == 4
+        assert other.get("key3") == rendered(3)
+        assert other.get("key4") is None
+    cache.close()
+
+
+def test_concurrent_run_gets_misses_instead_of_errors(docgen, quick_locks, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first = docgen.RenderCache(path)
+    second = docgen.RenderCache(path)
+    first.put("a", *rendered(1))
+    # first holds the write lock until its batch is committed
+    second.put("b", *rendered(2))
+    assert second.get("b") is None
+    assert second.get("a") is None
+    assert (second.hits, second.misses) == (0, 2)
+    first.put("c", *rendered(3))
+    assert second.get("a") == rendered(1)
+    second.put("b", *rendered(2))
+    second.close()
+    first.close()
+    with docgen.RenderCache(path) as cache:
+        assert cache.entries == 3
+
+
+def test_main_reports_a_locked_cache(docgen, quick_locks, tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "cache.sqlite")
+    holder = sqlite3.connect(path)
+    holder.execute("BEGIN EXCLUSIVE")
+    monkeypatch.setattr("sys.argv", ["docgen", "--cache", path])
+    with pytest.raises(SystemExit) as exited:
+        docgen.main()
+    assert "ERROR:" in str(exited.value.code)
+    holder.rollback()
+    holder.close()
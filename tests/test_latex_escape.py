@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+
+def chained_replace(docgen, text):
+    """Escape a text with one str.replace per special character, parking backslashes so escapes keep their braces."""
+    text = text.replace("\\", "\0")
+    for special, escaped in list(docgen.LATEX_ESCAPES.items())[1:]:
+        text = text.replace(special, escaped)
+    return text.replace("\0", docgen.LATEX_ESCAPES["\\"])
+
+
+def test_escape_matches_chained_replace(docgen):
+    rng = random.Random(0)
+    alphabet = "ab c" + "".join(docgen.LATEX_ESCAPES)
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert docgen.escape_latex(text) == chained_replace(docgen, text), text
+
+
+def test_every_special_is_escaped_once(docgen):
+    assert docgen.escape_latex("\\{}") == "\\textbackslash{}\\{\\}"
+    assert docgen.escape_latex("50% & $5 #1 a_b ~ ^") == (
+        "50\\% \\& \\$5 \\#1 a\\_b \\textasciitilde{} \\textasciicircum{}")
+
+
+def test_text_without_specials_is_returned_as_is(docgen):
+    text = "Plain words, with punctuation: nothing to escape."
+    assert docgen.escape_latex(text) is text
+    assert docgen.escape_latex(text, math=True) is text
+
+
+@pytest.mark.parametrize("math", ["$x_1$", "$$a^2 + b^2$$", "\\(x_1\\)", "\\[\\sum_i x_i\\]"])
+def test_math_passes_through_when_trusted(docgen, math):
+    text = f"Rate 50% for {math} & more"
+    assert docgen.escape_latex(text, math=True) == f"Rate 50\\% for {math} \\& more"
+    assert docgen.escape_latex(text) == chained_replace(docgen, text)
+
+
+def test_unbalanced_dollar_is_escaped_with_math(docgen):
+    assert docgen.escape_latex("costs $5", math=True) == "costs \\$5"
+
+
+def test_fields_are_escaped_once_per_record(docgen):
+    record = docgen.PaperRecord("R&D", ("A_B", "C"), "50%", "Plain content.", "Bio #1")
+    escaped = docgen.latex_fields(record)
+    assert escaped == docgen.PaperRecord("R\\&D", ("A\\_B", "C"), "50\\%", "Plain content.", "Bio \\#1")
+    assert docgen.latex_fields(record._replace()) is escaped
+    assert docgen.latex_fields(record, True) is not escaped
+
+
+def test_benchmark_reports_text_with_and_without_specials(docgen):
+    results = docgen.benchmark_latex_escaping(word_counts=(200,), repeat=1)
+    assert [result["special_rate"] for result in results] == [0.02, 0.0]
+    assert all(result["chained_ms"] > 0 and result["escape_ms"] > 0 for result in results)
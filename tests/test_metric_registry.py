@@ -0,0 +1,68 @@
+import pytest
+
+
+@pytest.fixture
+def record(docgen):
+    return docgen.PaperRecord("Title", ("Author",), "A short abstract here.",
+                              "Data pipelines move data. Pipelines scale data well!", "Bio.")
+
+
+def test_plan_puts_dependencies_first(docgen):
+    registry = docgen.MetricRegistry()
+    registry.register("words", lambda content: len(content.split()), ("content",))
+    registry.register("double", lambda words: words * 2, ("words",))
+    registry.register("both", lambda words, double: words + double, ("double", "words"))
+    assert [name for name, _, _ in registry.plan(["both"])] == ["words", "double", "both"]
+    assert registry.plan(("both",)) is registry.plan(["both"])
+
+
+def test_register_rejects_unknown_and_duplicate_metrics(docgen):
+    registry = docgen.MetricRegistry()
+    with pytest.raises(ValueError, match="unknown metric"):
+        registry.register("ratio", lambda words: words, ("words",))
+    registry.register("words", lambda content: len(content.split()), ("content",))
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register("words", len, ("content",))
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register("title", len, ("content",))
+
+
+def test_internal_metrics_are_not_reportable(docgen):
+    reportable = docgen.METRICS.reportable()
+    for name in ("content_tokens", "content_stats", "content_terms", "content_counts"):
+        assert name in docgen.METRICS.metrics
+        assert name not in reportable
+    assert set(docgen.CALCULATION_METRICS) <= set(reportable)
+
+
+def test_copy_keeps_internal_marks_and_leaves_the_original(docgen, record):
+    registry = docgen.METRICS.copy()
+    registry.register("content_density", lambda counts: counts["characters"] / counts["words"], ("content_counts",))
+    assert registry.reportable()[-1] == "content_density"
+    assert "content_density" not in docgen.METRICS.metrics
+    assert "content_counts" not in registry.reportable()
+    density = docgen.compute_metrics(record, ["content_density"], registry)["content_density"]
+    assert density == docgen.count_characters_no_spaces(record.content) / docgen.count_words(record.content)
+
+
+def test_compute_matches_perform_calculations(docgen, record):
+    calculations = docgen.perform_calculations(record)
+    assert docgen.compute_metrics(record, docgen.CALCULATION_METRICS) == calculations
+    assert calculations["keyword"] == "data"
+    assert docgen.compute_metrics(record, ["keyword_count"]) == {"keyword_count": 3}
+
+
+def test_content_is_split_once_for_words_and_terms(docgen, record, monkeypatch):
+    calls = []
+    text_statistics = docgen.text_statistics
+
+    def counting(text, count_terms=False, **options):
+        calls.append((text, count_terms))
+        return text_statistics(text, count_terms, **options)
+
+    monkeypatch.setattr(docgen, "text_statistics", counting)
+    docgen.perform_calculations(record)
+    assert calls == [(record.abstract, False), (record.content, True)]
+    calls.clear()
+    docgen.compute_metrics(record, ["content_counts"])
+    assert calls == [(record.content, False)]
@@ -0,0 +1,78 @@
+import io
+import random
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def texts(docgen):
+    rng = random.Random(10)
+    return [docgen.synthetic_text(rng, 300, distinct=True) for _ in range(4)]
+
+
+def edited(text, every):
+    words = text.split()
+    return " ".join("CHANGED" if i % every == 0 else word for i, word in enumerate(words))
+
+
+def shingle_jaccard(docgen, first, second, size=4):
+    def shingles(text):
+        words = docgen.word_tokens(text)
+        return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+    a, b = shingles(first), shingles(second)
+    return len(a & b) / len(a | b)
+
+
+def test_pairs_find_copies_and_light_edits(docgen, texts):
+    index = docgen.NearDuplicateIndex()
+    index.add(texts[0], 1)
+    index.add(texts[1], 2)
+    index.add(texts[0], 3)
+    index.add(edited(texts[1], 60), 5)
+    index.add(texts[2], 7)
+    pairs = index.pairs()
+    assert [(first, second) for first, second, _ in pairs] == [(1, 3), (2, 5)]
+    assert pairs[0][2] == 1.0
+    assert 0.8 <= pairs[1][2] < 1.0
+
+
+def test_similarity_estimates_shingle_jaccard(docgen, texts):
+    index = docgen.NearDuplicateIndex(threshold=0.0, num_perm=256, bands=64)
+    copy = edited(texts[3], 12)
+    index.add(texts[3], 1)
+    index.add(copy, 2)
+    (_, _, similarity), = index.pairs()
+    assert similarity == pytest.approx(shingle_jaccard(docgen, texts[3], copy), abs=0.12)
+
+
+def test_signatures(docgen, texts):
+    index = docgen.NearDuplicateIndex()
+    assert index.signature("") is None
+    assert index.signature(" ?! ") is None
+    assert len(index.signature("Two words")) == 128
+    assert index.signature(texts[0]) == index.signature(texts[0].upper())
+    index.add(None, 1)
+    assert len(index) == 0
+
+
+def test_bands_must_divide_the_permutations(docgen):
+    with pytest.raises(ValueError):
+        docgen.NearDuplicateIndex(num_perm=100, bands=16)
+
+
+def test_validation_reports_near_duplicates(docgen, texts):
+    paper = ("<paper><paper_title>T</paper_title><authors><author>A</author></authors><abstract>Ab.</abstract>"
+             "<content>{}</content><author_biography>B.</author_biography></paper>")
+    corpus = "<papers>" + "".join(paper.format(text) for text in (texts[0], texts[1], texts[0])) + "</papers>"
+    report = docgen.validate_xml_data(corpus, duplicates=docgen.NearDuplicateIndex())[0]
+    assert report["near_duplicates"] == [(1, 3, 1.0)]
+    assert "- WARNING: Paper 1 and Paper 3 are about 100% similar.\n" in docgen.generate_validation_report(report)
+    
+    positional = docgen.validate_xml_data(corpus, positions=True, duplicates=docgen.NearDuplicateIndex())[0]
+    assert positional["near_duplicates"] == [(1, 3, 1.0)]
+    streamed = docgen.process_xml_stream(io.BytesIO(corpus.encode("utf-8")), duplicates=docgen.NearDuplicateIndex())
+    assert streamed == docgen.process_xml_data(corpus, duplicates=docgen.NearDuplicateIndex())
+    
+    report = docgen.validate_xml_data("<papers>" + paper.format(texts[2]) + "</papers>",
+                                      duplicates=docgen.NearDuplicateIndex())[0]
+    assert "No near-duplicate papers found.\n" in docgen.generate_validation_report(report)
@@ -0,0 +1,55 @@
+import pickle
+import xml.etree.ElementTree as ET
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def elements(docgen):
+    corpus = docgen.synthetic_proceedings(papers=10, content_words=60, authors=3, seed=6)
+    return ET.fromstring(docgen.EXAMPLE_XML).findall("paper") + ET.fromstring(corpus).findall("paper")
+
+
+def test_validation_records_match_the_elements(docgen, elements):
+    report = docgen.new_validation_report()
+    for element in elements:
+        record = docgen.validate_paper(element, report)
+        assert record == docgen.paper_record(element)
+        assert isinstance(record.authors, tuple)
+    assert report["valid"]
+
+
+def test_records_render_like_elements(docgen, elements):
+    for element in elements:
+        record = docgen.paper_record(element)
+        calculations = docgen.perform_calculations(element)
+        assert docgen.perform_calculations(record) == calculations
+        assert (docgen.generate_detailed_report(record, calculations)
+                == docgen.generate_detailed_report(element, calculations))
+        assert docgen.generate_latex_document(record) == docgen.generate_latex_document(element)
+
+
+def test_invalid_papers_have_no_record(docgen):
+    report = docgen.new_validation_report()
+    element = ET.fromstring("<paper><paper_title>T</paper_title><authors><author> </author></authors></paper>")
+    assert docgen.validate_paper(element, report) is None
+    assert not report["valid"]
+    assert len(report["papers"][0]["errors"]) == 2
+
+
+def test_first_of_repeated_tags_is_kept(docgen):
+    element = ET.fromstring("<paper><paper_title>First</paper_title><paper_title>Second</paper_title>"
+                            "<authors><author>A</author><author/></authors><abstract>Ab</abstract>"
+                            "<content>C</content><author_biography>B</author_biography></paper>")
+    record = docgen.validate_paper(element, docgen.new_validation_report())
+    assert record == docgen.PaperRecord("First", ("A",), "Ab", "C", "B")
+    assert record == docgen.paper_record(element)
+
+
+def test_records_pickle_as_plain_tuples(docgen, elements):
+    record = docgen.paper_record(elements[0])
+    assert not hasattr(record, "__dict__")
+    copy = pickle.loads(pickle.dumps(record))
+    assert copy == record
+    assert type(copy) is docgen.PaperRecord
+    assert docgen.paper_fields(copy) is copy
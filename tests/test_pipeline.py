@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def corpus(docgen):
+    return docgen.synthetic_proceedings(papers=40, content_words=80, seed=1)
+
+
+@pytest.fixture(scope="module")
+def serial_report(docgen, corpus):
+    return docgen.process_xml_data(corpus)
+
+
+def test_example_report_is_stable(docgen):
+    assert docgen.process_xml_data(docgen.EXAMPLE_XML) == docgen.process_xml_data(docgen.EXAMPLE_XML)
+
+
+def test_stream_report_matches_serial(docgen, corpus, serial_report):
+    assert docgen.process_xml_stream(io.BytesIO(corpus.encode("utf-8"))) == serial_report
+
+
+def test_stream_report_from_path(docgen, corpus, serial_report, tmp_path):
+    path = tmp_path / "proceedings.xml"
+    path.write_text(corpus, encoding="utf-8")
+    assert docgen.process_xml_stream(str(path)) == serial_report
+
+
+def test_stream_report_written_to_output(docgen, corpus, serial_report):
+    output = io.StringIO()
+    assert docgen.process_xml_stream(io.BytesIO(corpus.encode("utf-8")), output) is None
+    assert output.getvalue() == serial_report
+
+
+@pytest.mark.parametrize("data", ["<papers>", "not xml", "<papers></papers>"])
+def test_stream_rejects_what_process_xml_data_rejects(docgen, data):
+    assert docgen.process_xml_stream(io.BytesIO(data.encode("utf-8"))) == docgen.process_xml_data(data)
+
+
+def test_stream_reports_invalid_papers_like_process_xml_data(docgen):
+    corpus = docgen.synthetic_proceedings(papers=20, content_words=40, invalid_rate=0.3, seed=2)
+    report = docgen.process_xml_data(corpus)
+    assert "ERROR:" in report
+    assert docgen.process_xml_stream(io.BytesIO(corpus.encode("utf-8"))) == report
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 64])
+def test_parallel_report_matches_serial(docgen, corpus, serial_report, chunksize):
+    assert docgen.process_xml_data(corpus, workers=2, chunksize=chunksize) == serial_report
+
+
+def test_parallel_stream_report_matches_serial(docgen, corpus, serial_report):
+    source = io.BytesIO(corpus.encode("utf-8"))
+    assert docgen.process_xml_stream(source, workers=3, chunksize=4) == serial_report
+
+
+def test_parallel_render_keeps_input_order(docgen, corpus):
+    report, records = docgen.validate_xml_data(corpus)
+    serial = list(docgen.render_papers(records))
+    assert list(docgen.render_papers(records, workers=2, chunksize=3)) == serial
+
+
+def test_parallel_report_with_invalid_papers_matches_serial(docgen):
+    corpus = docgen.synthetic_proceedings(papers=20, content_words=40, invalid_rate=0.3, seed=2)
+    assert docgen.process_xml_data(corpus, workers=2) == docgen.process_xml_data(corpus)
@@ -0,0 +1,67 @@
+import io
+import json
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def corpus(docgen):
+    return docgen.synthetic_proceedings(papers=12, content_words=60, seed=4)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_profiled_report_matches_unprofiled(docgen, corpus, workers):
+    profiler = docgen.PipelineProfiler()
+    report = docgen.process_xml_data(corpus, workers=workers, profiler=profiler)
+    assert report == docgen.process_xml_data(corpus)
+    assert profiler.papers_rendered == 12
+    assert [entry["paper"] for entry in profiler.papers] == list(range(1, 13))
+    assert profiler.stages["calculations"]["calls"] == 12
+    assert profiler.stages["total"]["calls"] == 1
+    assert profiler.bytes_parsed == len(corpus.encode("utf-8"))
+    assert profiler.bytes_emitted == len(report.encode("utf-8"))
+
+
+def test_profiled_stream_counts_bytes(docgen, corpus):
+    profiler = docgen.PipelineProfiler(per_paper=False)
+    report = docgen.process_xml_stream(io.BytesIO(corpus.encode("utf-8")), profiler=profiler)
+    assert report == docgen.process_xml_data(corpus)
+    assert profiler.bytes_parsed == len(corpus.encode("utf-8"))
+    assert profiler.stages["parse"]["calls"] > 0
+    assert profiler.papers == []
+    assert profiler.papers_rendered == 12
+
+
+def test_hooks_receive_every_measurement(docgen, corpus):
+    profiler = docgen.PipelineProfiler()
+    samples = []
+    profiler.add_hook(samples.append)
+    docgen.process_xml_data(corpus, profiler=profiler)
+    assert len(samples) == sum(totals["calls"] for totals in profiler.stages.values())
+    assert {sample["paper"] for sample in samples if sample["stage"] == "latex_document"} == set(range(1, 13))
+
+
+def test_trace_memory_records_a_peak(docgen, corpus):
+    profiler = docgen.PipelineProfiler(trace_memory=True)
+    docgen.process_xml_data(corpus, profiler=profiler)
+    assert profiler.peak_memory_bytes > 0
+
+
+def test_exports(docgen, corpus):
+    profiler = docgen.PipelineProfiler()
+    docgen.process_xml_data(corpus, profiler=profiler)
+    assert json.loads(profiler.to_json()) == json.loads(json.dumps(profiler.to_dict()))
+    text = profiler.to_prometheus()
+    assert text.endswith("\n")
+    assert 'latex_docgen_stage_calls_total{stage="calculations"} 12' in text
+    assert "latex_docgen_papers_rendered_total 12" in text
+    assert "peak_memory_bytes" not in text
+
+
+def test_main_writes_the_profile(docgen, corpus, tmp_path, capsys):
+    source = tmp_path / "proceedings.xml"
+    source.write_text(corpus, encoding="utf-8")
+    profile = tmp_path / "profile.prom"
+    docgen.main([str(source), "--profile", str(profile), "--profile-format", "prometheus"])
+    assert capsys.readouterr().out == docgen.process_xml_data(corpus)
+    assert "latex_docgen_papers_rendered_total 12" in profile.read_text(encoding="utf-8")
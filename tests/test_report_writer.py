@@ -0,0 +1,48 @@
+import io
+import pathlib
+
+import pytest
+
+EXAMPLE_REPORT = pathlib.Path(__file__).resolve().parent / "data" / "example_report.md"
+
+
+def test_example_report_matches_the_original_output(docgen):
+    assert docgen.process_xml_data(docgen.EXAMPLE_XML) == EXAMPLE_REPORT.read_bytes().decode("utf-8")
+
+
+def test_report_is_generated_in_many_chunks(docgen):
+    chunks = list(docgen.iter_xml_report(docgen.EXAMPLE_XML))
+    assert len(chunks) > 10
+    assert all(isinstance(chunk, str) for chunk in chunks)
+    assert "".join(chunks) == docgen.process_xml_data(docgen.EXAMPLE_XML)
+
+
+def test_report_chunks_are_produced_lazily(docgen):
+    chunks = docgen.iter_xml_report(docgen.EXAMPLE_XML)
+    assert next(chunks) == "# Data Validation Report:\n"
+
+
+def test_write_chunks_writes_the_report(docgen):
+    sink = io.StringIO()
+    docgen.write_chunks(docgen.iter_xml_report(docgen.EXAMPLE_XML), sink)
+    assert sink.getvalue() == docgen.process_xml_data(docgen.EXAMPLE_XML)
+
+
+@pytest.mark.parametrize("valid", [True, False])
+def test_generate_functions_join_their_chunks(docgen, valid):
+    data = docgen.EXAMPLE_XML if valid else "<papers><paper><paper_title>T</paper_title></paper></papers>"
+    report, records = docgen.validate_xml_data(data)
+    assert docgen.generate_validation_report(report) == "".join(docgen.iter_validation_report(report))
+    for record in records or ():
+        calculations = docgen.perform_calculations(record)
+        assert docgen.generate_detailed_report(record, calculations) == "".join(
+            docgen.iter_detailed_report(record, calculations))
+        assert docgen.generate_latex_document(record) == "".join(docgen.iter_latex_document(record))
+
+
+def test_main_writes_the_report_to_output(docgen, tmp_path):
+    source = tmp_path / "proceedings.xml"
+    source.write_text(docgen.EXAMPLE_XML, encoding="utf-8")
+    output = tmp_path / "report.md"
+    docgen.main([str(source), "-o", str(output)])
+    assert output.read_text(encoding="utf-8") == docgen.process_xml_data(docgen.EXAMPLE_XML)
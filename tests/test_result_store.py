@@ -0,0 +1,64 @@
+import io
+import os
+import stat
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def corpus(docgen):
+    return docgen.synthetic_proceedings(papers=9, content_words=60, seed=7)
+
+
+def test_store_round_trips_every_paper(docgen, corpus, tmp_path):
+    path = str(tmp_path / "run.store")
+    validation_result = docgen.write_result_store(io.StringIO(corpus), path, workers=2, chunksize=2)
+    assert validation_result["valid"]
+    report, records = docgen.validate_xml_data(corpus)
+    with docgen.ResultStore(path) as store:
+        assert len(store) == 9
+        for number, record in enumerate(records, 1):
+            calculations, detailed, latex = docgen.render_paper(record)
+            assert store.paper(number) == {"calculations": calculations, "detailed_report": detailed,
+                                           "latex_document": latex}
+        sections = "".join(store.section(number) for number in range(1, 10))
+        assert sections in docgen.process_xml_data(corpus)
+        with pytest.raises(IndexError):
+            store.get(10)
+
+
+def test_store_gets_the_mode_of_a_new_file(docgen, corpus, tmp_path):
+    path = str(tmp_path / "run.store")
+    umask = os.umask(0o027)
+    try:
+        docgen.write_result_store(io.StringIO(corpus), path)
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_invalid_input_keeps_the_previous_store(docgen, corpus, tmp_path):
+    path = str(tmp_path / "run.store")
+    docgen.write_result_store(io.StringIO(corpus), path)
+    before = open(path, "rb").read()
+    invalid = docgen.synthetic_proceedings(papers=9, content_words=60, invalid_rate=0.5, seed=7)
+    assert not docgen.write_result_store(io.StringIO(invalid), path)["valid"]
+    assert not docgen.write_result_store(io.StringIO("<papers>"), path, positions=True)["valid"]
+    assert open(path, "rb").read() == before
+    assert os.listdir(tmp_path) == ["run.store"]
+
+
+@pytest.mark.parametrize("data", [b"", b"short", b"NOTASTORE" + bytes(40)])
+def test_store_rejects_other_files(docgen, tmp_path, data):
+    path = tmp_path / "other.bin"
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        docgen.ResultStore(str(path))
+
+
+def test_store_rejects_a_truncated_index(docgen, corpus, tmp_path):
+    path = tmp_path / "run.store"
+    docgen.write_result_store(io.StringIO(corpus), str(path))
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        docgen.ResultStore(str(path))
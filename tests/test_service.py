@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def corpus(docgen):
+    return docgen.synthetic_proceedings(papers=10, content_words=60, seed=5)
+
+
+def serve(docgen, scenario, **options):
+    """Run scenario(service) against a DocumentService listening on a free local port."""
+    async def main():
+        service = docgen.DocumentService(workers=1, **options)
+        await service.start("127.0.0.1", 0)
+        try:
+            return await scenario(service)
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+
+async def raw_request(service, data):
+    """Send raw bytes and return the status code of the response, without reading on after it."""
+    reader, writer = await asyncio.open_connection(*service.address[:2])
+    try:
+        writer.write(data)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), 10)
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+def submit(docgen, service, xml_data):
+    return docgen.submit_report(xml_data, *service.address[:2])
+
+
+def test_report_matches_process_xml_data(docgen, corpus):
+    async def scenario(service):
+        chunks = []
+        status, text = await docgen.submit_report(corpus, *service.address[:2], on_chunk=chunks.append)
+        return status, text, len(chunks), service.active
+    status, text, chunks, active = serve(docgen, scenario, window=3)
+    assert status == 200
+    assert text == docgen.process_xml_data(corpus)
+    assert chunks > 10
+    assert active == 0
+
+
+@pytest.mark.parametrize("data", ["<papers>", "<papers><paper/></papers>"])
+def test_invalid_submissions_get_the_validation_report(docgen, data):
+    async def scenario(service):
+        return await submit(docgen, service, data)
+    assert serve(docgen, scenario) == (200, docgen.process_xml_data(data))
+
+
+@pytest.mark.parametrize("request_bytes, status", [
+    (b"GET /report HTTP/1.1\r\n\r\n", 405),
+    (b"POST /other HTTP/1.1\r\nContent-Length: 0\r\n\r\n", 404),
+    (b"POST /report HTTP/1.1\r\n\r\n", 411),
+    (b"NONSENSE\r\n\r\n", 400),
+    (b"POST /report HTTP/1.1\r\nContent-Length: 2000\r\n\r\n", 413),
+])
+def test_bad_requests(docgen, request_bytes, status):
+    async def scenario(service):
+        return await raw_request(service, request_bytes)
+    assert serve(docgen, scenario, max_body_bytes=1000) == status
+
+
+def test_over_capacity_is_rejected_before_the_body_is_sent(docgen):
+    async def scenario(service):
+        # Only the head is sent; the 503 must not wait for the 64 MiB body
+        status = await raw_request(service, b"POST /report HTTP/1.1\r\nContent-Length: 67108864\r\n\r\n")
+        return status, service.rejected
+    assert serve(docgen, scenario, max_requests=0) == (503, 1)
+
+
+def test_rejected_clients_still_read_the_response(docgen, corpus):
+    async def scenario(service):
+        return await submit(docgen, service, corpus)
+    status, text = serve(docgen, scenario, max_requests=0)
+    assert status == 503
+    assert "retry" in text
+
+
+def test_slow_body_times_out(docgen):
+    async def scenario(service):
+        return await raw_request(service, b"POST /report HTTP/1.1\r\nContent-Length: 10\r\n\r\n<pa")
+    assert serve(docgen, scenario, timeout=0.2) == 408
+
+
+def test_render_errors_end_the_report(docgen, corpus):
+    templates = docgen.template_set({"detailed_report": "{title:.2f}"})
+    async def scenario(service):
+        status, text = await submit(docgen, service, corpus)
+        return status, text, service.active
+    status, text, active = serve(docgen, scenario, templates=templates)
+    assert status == 200
+    assert text.startswith(docgen.generate_validation_report(docgen.validate_xml_data(corpus)[0]))
+    assert text.endswith("ERROR: Rendering failed: ValueError: Unknown format code 'f' for object of type 'str'\n")
+    assert active == 0
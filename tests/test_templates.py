@@ -0,0 +1,63 @@
+import pytest
+
+SOURCES = [
+    "",
+    "plain text",
+    "{title} and {title}",
+    "{{braces}} {value:.2f} {value:>8.3f} {name!r} {name!s:10}",
+    "{value:,} {value:+.1%} {name:^12}",
+]
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_compiled_template_matches_str_format(docgen, source):
+    context = {"title": "T", "value": 1234.5678, "name": "x"}
+    assert docgen.CompiledTemplate(source)(context) == source.format(**context)
+
+
+@pytest.mark.parametrize("source", [
+    "{}",
+    "{0}",
+    "{paper.title}",
+    "{paper[title]}",
+    "{value:{width}}",
+    "{value!x}",
+])
+def test_compiled_template_rejections(docgen, source):
+    with pytest.raises(ValueError):
+        docgen.CompiledTemplate(source)
+
+
+def test_compiled_template_lists_its_fields(docgen):
+    assert docgen.CompiledTemplate("{b} {a} {b:.1f}").fields == ["a", "b"]
+
+
+@pytest.mark.parametrize("name, source", [
+    ("detailed_report", "{title} {unknown_metric}"),
+    ("detailed_report", "{content_tokens}"),
+    ("latex_document", "{number}"),
+    ("latex_section", "{title}"),
+    ("tex_paper", "{paragraph}"),
+    ("tex_introduction", "{body}"),
+    ("tex_proceedings", "{authors}"),
+])
+def test_template_set_rejects_fields_outside_its_context(docgen, name, source):
+    with pytest.raises(ValueError, match=name):
+        docgen.TemplateSet({name: source})
+
+
+def test_template_set_accepts_every_context_field(docgen):
+    sources = {name: " ".join(f"{{{field}}}" for field in fields) for name, fields in docgen.TemplateSet.FIELDS.items()}
+    sources["detailed_report"] += " {keyword_fraction} {complexity_score:.2f}"
+    templates = docgen.TemplateSet(sources)
+    report, records = docgen.validate_xml_data(docgen.EXAMPLE_XML)
+    assert docgen.generate_detailed_report(records[0], docgen.perform_calculations(records[0]), templates)
+    assert docgen.render_paper_tex(records[0], 1, templates)
+
+
+def test_main_reports_bad_templates_as_usage_errors(docgen, tmp_path, capsys):
+    (tmp_path / "tex_section.tmpl").write_text("{paragraph} {title}", encoding="utf-8")
+    with pytest.raises(SystemExit) as exited:
+        docgen.main(["--templates", str(tmp_path)])
+    assert exited.value.code == 2
+    assert "tex_section" in capsys.readouterr().err
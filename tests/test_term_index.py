@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+CONTENTS = [
+    "Graph models and graph data. Models scale!",
+    "Data pipelines move data; the graph is optional.",
+    "",
+    "Nothing in common here, only café words.",
+]
+
+
+@pytest.fixture
+def index(docgen):
+    index = docgen.TermIndex()
+    for content in CONTENTS:
+        index.add(content)
+    return index
+
+
+@pytest.mark.parametrize("keyword", ["graph", "Data", "models", "café", "missing", "the"])
+def test_density_matches_keyword_density(docgen, index, keyword):
+    for paper, content in enumerate(CONTENTS):
+        assert index.density(keyword, paper) == pytest.approx(docgen.keyword_density(content, keyword))
+
+
+def test_counts_and_mentions(index):
+    assert len(index) == 4
+    assert index.count("GRAPH", 0) == 2
+    assert index.count("graph", 2) == 0
+    assert index.papers_mentioning("data") == {0: 1, 1: 2}
+    assert index.papers_mentioning("absent") == {}
+
+
+def test_phrases_are_rejected(index):
+    with pytest.raises(ValueError):
+        index.count("graph data", 0)
+
+
+def test_top_keywords_skip_stopwords_and_short_terms(index):
+    assert index.top_keywords(0, 2, weighting="count") == [("graph", 2), ("models", 2)]
+    assert index.top_keywords(2) == []
+    assert all(term not in ("the", "is") for term, _ in index.top_keywords(1, 10))
+    assert index.top_keywords(0, 0) == []
+
+
+def test_top_count_keyword_matches_perform_calculations(docgen):
+    corpus = docgen.synthetic_proceedings(papers=8, content_words=120, seed=3)
+    index = docgen.build_term_index(io.StringIO(corpus))
+    for paper, element in enumerate(docgen.ET.fromstring(corpus).iter("paper")):
+        calculations = docgen.perform_calculations(element)
+        assert index.top_keywords(paper, 1, "count") == [(calculations["keyword"], calculations["keyword_count"])]
+
+
+def test_top_keywords_rank_by_tf_idf(index):
+    (term, weight), = index.top_keywords(1, 1)
+    assert term == "data"
+    assert weight == pytest.approx(index.tf_idf("data", 1))
+    with pytest.raises(ValueError):
+        index.top_keywords(1, weighting="bm25")
+
+
+def test_keyword_report_streams_the_same_text(docgen, index):
+    chunks = list(docgen.iter_keyword_report(index, ["graph"]))
+    assert len(chunks) > 1
+    report = docgen.generate_keyword_report(index, ["graph"])
+    assert "".join(chunks) == report
+    assert "- Paper 1: 2 occurrence(s), density 28.57%\n" in report
+    assert "- Paper 3: \n" in report
+
+
+def test_build_term_index_reads_papers(docgen):
+    index = docgen.build_term_index(io.StringIO(docgen.EXAMPLE_XML))
+    assert len(index) == docgen.EXAMPLE_XML.count("<paper>")
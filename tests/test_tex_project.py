@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def corpus(docgen):
+    return docgen.synthetic_proceedings(papers=5, content_words=60, seed=8)
+
+
+def write(docgen, corpus, directory, **options):
+    return docgen.write_tex_project(io.StringIO(corpus), str(directory), shard_size=2, **options)
+
+
+def manifest(directory):
+    with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as source:
+        return json.load(source)["files"]
+
+
+def test_project_files_and_master(docgen, corpus, tmp_path):
+    validation_result, counts = write(docgen, corpus, tmp_path)
+    assert validation_result["valid"]
+    assert counts == {"papers": 5, "written": 6, "unchanged": 0, "removed": 0}
+    assert sorted(os.listdir(tmp_path / "papers")) == ["0000", "0001", "0002"]
+    master = (tmp_path / "proceedings.tex").read_text(encoding="utf-8")
+    assert "\\input{papers/0002/paper-000005}\n" in master
+    assert set(manifest(tmp_path)) == {"proceedings.tex"} | {
+        f"papers/{(number - 1) // 2:04d}/paper-{number:06d}.tex" for number in range(1, 6)}
+
+
+def test_unchanged_files_are_not_rewritten(docgen, corpus, tmp_path):
+    write(docgen, corpus, tmp_path)
+    assert write(docgen, corpus, tmp_path)[1] == {"papers": 5, "written": 0, "unchanged": 6, "removed": 0}
+    
+    # A file edited by hand no longer matches its manifest entry, so it is rewritten
+    paper = tmp_path / "papers" / "0000" / "paper-000001.tex"
+    expected = paper.read_text(encoding="utf-8")
+    paper.write_text("edited by hand, and longer", encoding="utf-8")
+    assert write(docgen, corpus, tmp_path)[1]["written"] == 1
+    assert paper.read_text(encoding="utf-8") == expected
+
+
+def test_changed_paper_rewrites_only_its_file(docgen, corpus, tmp_path):
+    write(docgen, corpus, tmp_path)
+    changed = corpus.replace("<content>", "<content>Revised. ", 1)
+    assert write(docgen, changed, tmp_path)[1] == {"papers": 5, "written": 1, "unchanged": 5, "removed": 0}
+
+
+def test_dropped_papers_are_removed(docgen, corpus, tmp_path):
+    write(docgen, corpus, tmp_path)
+    root = ET.fromstring(corpus)
+    for paper in root.findall("paper")[2:]:
+        root.remove(paper)
+    counts = write(docgen, ET.tostring(root, encoding="unicode"), tmp_path)[1]
+    assert counts == {"papers": 2, "written": 1, "unchanged": 2, "removed": 3}
+    assert os.listdir(tmp_path / "papers") == ["0000"]
+    assert len(manifest(tmp_path)) == 3
+
+
+def test_abort_records_the_batches_already_written(docgen, corpus, tmp_path):
+    write(docgen, corpus, tmp_path)
+    before = manifest(tmp_path)
+    records = docgen.validate_xml_data(corpus.replace("<content>", "<content>Revised. "))[1]
+    writer = docgen.TexProjectWriter(str(tmp_path), shard_size=2, batch_bytes=1)
+    writer.add(1, records[0])
+    writer.add(2, records[1])
+    writer.abort()
+    after = manifest(tmp_path)
+    assert after["papers/0000/paper-000001.tex"] != before["papers/0000/paper-000001.tex"]
+    assert after["papers/0002/paper-000005.tex"] == before["papers/0002/paper-000005.tex"]
+    # The next run trusts the manifest for the files the aborted run replaced, and the master is unchanged
+    counts = write(docgen, corpus.replace("<content>", "<content>Revised. "), tmp_path)[1]
+    assert counts == {"papers": 5, "written": 3, "unchanged": 3, "removed": 0}
+
+
+def test_invalid_input_leaves_the_project_alone(docgen, corpus, tmp_path):
+    write(docgen, corpus, tmp_path)
+    before = manifest(tmp_path)
+    invalid = docgen.synthetic_proceedings(papers=5, content_words=60, invalid_rate=0.5, seed=8)
+    assert write(docgen, invalid, tmp_path)[1] is None
+    validation_result, counts = write(docgen, "<papers><paper>", tmp_path, positions=True)
+    assert counts is None
+    assert "line 1, column 16" in validation_result["errors"][0]
+    assert manifest(tmp_path) == before
@@ -0,0 +1,102 @@
+import random
+import re
+from collections import Counter
+
+import pytest
+
+EDGE_CASES = [
+    "",
+    "One.",
+    "One two three",
+    "Ends with a stop. ",
+    "Spaces  and\ttabs\nand newlines.\n",
+    "A lone . mark ! here ?",
+    "Dots...everywhere... and e.g. abbreviations.",
+    "Punctuation, inside; words: like-this and x_y!",
+    "Unicode café naïve Σσ İstanbul straße.",
+    "Numbers 3.14 and 1,000 count too?",
+    "?!.",
+    ". . .",
+]
+
+
+def random_texts(count=2000, seed=0):
+    rng = random.Random(seed)
+    alphabet = "abcXYZ09_ İéß.,;:!?-'\n\tΣσ"
+    for _ in range(count):
+        yield "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+
+
+def legacy_terms(docgen, text, min_term_length=3):
+    terms = {}
+    for word in re.findall(r'\b\w+\b', text.lower()):
+        if word not in docgen.STOPWORDS and len(word) >= min_term_length:
+            terms[word] = terms.get(word, 0) + 1
+    return terms
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_counts_match_the_regex_scans(docgen, text):
+    stats = docgen.text_statistics(text, count_terms=True)
+    assert stats["words"] == docgen.count_words(text)
+    assert stats["characters"] == docgen.count_characters_no_spaces(text)
+    assert stats["sentences"] == docgen.count_sentences(text)
+    assert stats["terms"] == legacy_terms(docgen, text)
+
+
+def test_counts_match_the_regex_scans_on_random_text(docgen):
+    for text in random_texts():
+        stats = docgen.text_statistics(text, count_terms=True)
+        expected = (docgen.count_words(text), docgen.count_characters_no_spaces(text),
+                    docgen.count_sentences(text), legacy_terms(docgen, text))
+        assert (stats["words"], stats["characters"], stats["sentences"], stats["terms"]) == expected, text
+
+
+def test_counts_match_on_synthetic_prose(docgen):
+    rng = random.Random(1)
+    for distinct in (False, True):
+        text = docgen.synthetic_text(rng, 3000, distinct=distinct)
+        stats = docgen.text_statistics(text, count_terms=True)
+        assert stats["words"] == docgen.count_words(text)
+        assert stats["sentences"] == docgen.count_sentences(text)
+        assert list(stats["terms"].items()) == list(legacy_terms(docgen, text).items())
+
+
+def test_terms_are_only_counted_when_asked(docgen):
+    assert docgen.text_statistics("Some words here.")["terms"] is None
+    assert docgen.text_statistics("", count_terms=True)["terms"] == {}
+
+
+def test_precomputed_tokens_give_the_same_counts(docgen):
+    text = "Words repeat. Words repeat again!"
+    tokens = docgen.token_counts(text)
+    assert docgen.text_statistics(text, True, tokens=tokens) == docgen.text_statistics(text, True)
+    assert docgen.term_counts(tokens) == legacy_terms(docgen, text)
+
+
+@pytest.mark.parametrize("window", [1, 2, 5])
+def test_token_counts_windows_match_split(docgen, monkeypatch, window):
+    monkeypatch.setattr(docgen, "TOKEN_WINDOW_SIZE", window)
+    for text in random_texts(500, seed=window):
+        counts = docgen.token_counts(text)
+        assert list(counts.items()) == list(Counter(text.split()).items()), text
+
+
+def test_word_tokens_follow_the_text(docgen):
+    assert docgen.word_tokens("The Cat, the hat; x-y İ.") == ["the", "cat", "the", "hat", "x", "y", "i"]
+    for text in random_texts(500):
+        assert docgen.word_tokens(text) == re.findall(r'\w+', text.lower()), text
+
+
+def test_benchmark_reports_repeated_and_distinct_text(docgen):
+    results = docgen.benchmark_text_stats(word_counts=(200,), repeat=1)
+    assert [result["tokens"] for result in results] == ["repeated", "distinct"]
+    assert all(result["legacy_ms"] > 0 and result["fused_ms"] > 0 for result in results)
+
+
+def test_split_token_counts_words_without_terms(docgen):
+    for text in random_texts(500, seed=3):
+        for token in text.split():
+            words, terms = docgen.split_token(token)
+            assert docgen.split_token(token, False) == (words, None), token
+            assert words == len(re.findall(r'\w+', token))
@@ -0,0 +1,124 @@
+import io
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+
+PAPER = ("<paper><paper_title>{title}</paper_title><authors><author>Ada Lovelace</author></authors>"
+         "<abstract>A short abstract.</abstract><content>{content}</content>"
+         "<author_biography>A biography.</author_biography></paper>")
+
+
+def paper(title="A Title", content="Some content."):
+    return PAPER.format(title=title, content=content)
+
+
+def big_document():
+    """A document over 64 KiB whose two-byte characters straddle the parser's chunk boundaries."""
+    head = "<papers>" + paper() + "<paper><paper_title>"
+    # An odd head puts the first byte of every é at an odd offset, like 64 KiB - 1
+    if len(head.encode("utf-8")) % 2 == 0:
+        head = head.replace("<papers>", "<papers> ")
+    return (head + "é" * 70000 + paper()[len("<paper><paper_title>"):] + "</papers>").encode("utf-8")
+
+
+CASES = {
+    "valid": "<papers>" + paper() + paper("Second") + "</papers>",
+    "invalid paper": "<papers>\n  <paper><paper_title>T</paper_title></paper>\n  " + paper() + "\n</papers>",
+    "empty root": "<papers/>",
+    "other children": "<papers><note>skip</note>" + paper() + "</papers>",
+    "namespaces": '<papers xmlns:x="urn:x"><paper x:id="1"' + paper()[6:] + "</papers>",
+    "entities": ('<!DOCTYPE papers [<!ENTITY co "Co">]><papers>'
+                 + paper("&co; &amp; caf&#233;") + "</papers>"),
+    "undefined entity": "<papers>" + paper("&undefined;") + "</papers>",
+    "latin-1 bytes": ('<?xml version="1.0" encoding="ISO-8859-1"?><papers>'
+                      + paper("Café") + "</papers>").encode("latin-1"),
+    "latin-1 declaration in text": ('<?xml version="1.0" encoding="ISO-8859-1"?><papers>'
+                                    + paper("Café") + "</papers>"),
+    "utf-16 bytes": "<papers>" + paper("Café") + "</papers>",
+    "truncated": "<papers>" + paper() + "<paper>",
+    "mismatched tag": "<papers>" + paper() + "</paper>",
+    "not xml": "plain text",
+    "empty": "",
+    "over 64 KiB": big_document(),
+    "over 64 KiB truncated": big_document()[:-20],
+}
+CASES["utf-16 bytes"] = ('<?xml version="1.0" encoding="UTF-16"?>' + CASES["utf-16 bytes"]).encode("utf-16")
+
+
+def without_positions(result):
+    """Drop the source positions that positional validation adds to a validation result."""
+    report, records = result
+    report = dict(report)
+    report["errors"] = [re.sub(r" \(line \d+, column \d+\)", "", error) for error in report["errors"]]
+    report["papers"] = [{key: value for key, value in entry.items() if key not in ("line", "column")}
+                        for entry in report["papers"]]
+    for entry in report["papers"]:
+        entry["errors"] = [re.sub(r" \(line \d+, column \d+\)", "", error) for error in entry["errors"]]
+    return report, records
+
+
+def parse_error(data):
+    try:
+        ET.fromstring(data)
+    except ET.ParseError as error:
+        return error
+    return None
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_positional_validation_matches_default(docgen, name):
+    data = CASES[name]
+    default = docgen.validate_xml_data(data)
+    positional = docgen.validate_xml_data(data, positions=True)
+
+    if parse_error(data) is None:
+        assert without_positions(positional) == default
+    else:
+        # Both reject the input, the positional report also says where, with a 1-based column
+        line, column = parse_error(data).position
+        assert default == (docgen.invalid_format_report(), None)
+        assert positional[1] is None
+        assert not positional[0]["valid"]
+        assert f"at line {line}, column {column + 1})" in positional[0]["errors"][0]
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_positioned_children_match_elementtree(docgen, name):
+    data = CASES[name]
+    source = data.encode("utf-8") if isinstance(data, str) else data
+    expected = parse_error(data)
+
+    if expected is None:
+        elements = [ET.tostring(element) for element in docgen.iter_root_children(io.BytesIO(source))]
+        positioned = [ET.tostring(element) for element, _ in docgen.iter_positioned_children(io.BytesIO(source))]
+        assert positioned == elements
+    else:
+        with pytest.raises(ET.ParseError) as raised:
+            list(docgen.iter_positioned_children(io.BytesIO(source)))
+        assert raised.value.position == expected.position
+
+
+def test_big_document_straddles_chunk_boundary(docgen):
+    data = CASES["over 64 KiB"]
+    assert len(data) > docgen.STREAM_CHUNK_SIZE
+    assert data[docgen.STREAM_CHUNK_SIZE - 1] == "é".encode("utf-8")[0]
+
+
+def test_namespaced_attributes(docgen):
+    (element, _), = docgen.iter_positioned_children(CASES["namespaces"])
+    assert element.attrib == {"{urn:x}id": "1"}
+
+
+def test_positions_are_start_tags(docgen):
+    data = "<papers>\n  " + paper() + "\n\n    " + paper() + "</papers>"
+    positions = [position for _, position in docgen.iter_positioned_children(data)]
+    assert positions == [(2, 2), (4, 4)]
+
+
+def test_max_errors_stops_after_limit(docgen):
+    bad = "<paper><paper_title>T</paper_title></paper>"
+    report, records = docgen.validate_xml_data("<papers>" + bad * 3 + paper() + "</papers>", max_errors=2)
+    assert report["total_papers"] == 2
+    assert not report["valid"]
+    assert report["errors"][-1].startswith("ERROR: Validation stopped after 2 invalid paper(s)")
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def corpus(docgen):
+    return docgen.synthetic_proceedings(papers=6, content_words=60, seed=9)
+
+
+def test_refresh_renders_only_changed_papers(docgen, corpus, tmp_path):
+    source = tmp_path / "proceedings.xml"
+    source.write_text(corpus, encoding="utf-8")
+    report = tmp_path / "proceedings.md"
+    watcher = docgen.ProceedingsWatcher(str(source), str(report), str(tmp_path / "tex"))
+    assert watcher.changed()
+    assert watcher.refresh()[1:] == (6, 6)
+    assert report.read_text(encoding="utf-8") == docgen.process_xml_data(corpus)
+    assert (tmp_path / "tex" / "proceedings.tex").exists()
+    
+    revised = corpus.replace("<content>", "<content>Revised. ", 1)
+    source.write_text(revised, encoding="utf-8")
+    assert watcher.changed()
+    assert not watcher.changed()
+    assert watcher.refresh()[1:] == (6, 1)
+    assert report.read_text(encoding="utf-8") == docgen.process_xml_data(revised)
+    expected = docgen.render_paper_tex(docgen.validate_xml_data(revised)[1][0], 1)
+    assert (tmp_path / "tex" / "papers" / "0000" / "paper-000001.tex").read_text(encoding="utf-8") == expected
+
+
+def test_invalid_edits_keep_the_warm_papers(docgen, corpus, tmp_path):
+    source = tmp_path / "proceedings.xml"
+    source.write_text(corpus, encoding="utf-8")
+    report = tmp_path / "proceedings.md"
+    watcher = docgen.ProceedingsWatcher(str(source), str(report))
+    watcher.refresh()
+    
+    for broken in (corpus[:-20], "<papers/>", corpus.replace("<abstract>", "<abstract_>", 1)):
+        source.write_text(broken, encoding="utf-8")
+        validation_result, papers, rendered = watcher.refresh()
+        assert not validation_result["valid"] or papers == 0
+        assert report.read_text(encoding="utf-8") == docgen.process_xml_data(broken)
+    
+    source.write_text(corpus, encoding="utf-8")
+    assert watcher.refresh()[1:] == (6, 0)
+    assert report.read_text(encoding="utf-8") == docgen.process_xml_data(corpus)
+
+
+def test_repeated_papers_render_once(docgen, corpus, tmp_path):
+    source = tmp_path / "proceedings.xml"
+    papers = corpus[len("<papers>\n"):-len("</papers>\n")]
+    source.write_text("<papers>\n" + papers + papers + "</papers>\n", encoding="utf-8")
+    watcher = docgen.ProceedingsWatcher(str(source), str(tmp_path / "proceedings.md"))
+    assert watcher.refresh()[1:] == (12, 6)
+    assert (tmp_path / "proceedings.md").read_text(encoding="utf-8") == docgen.process_xml_data(source.read_text())
+
+
+def test_missing_files_are_not_changed(docgen, tmp_path):
+    watcher = docgen.ProceedingsWatcher(str(tmp_path / "missing.xml"), str(tmp_path / "missing.md"))
+    assert not watcher.changed()
+
+
+def test_watch_directory(docgen, corpus, tmp_path, capsys):
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    (inputs / "b.xml").write_text(corpus, encoding="utf-8")
+    (inputs / "a.xml").write_text("<papers><paper/></papers>", encoding="utf-8")
+    (inputs / "notes.txt").write_text("ignored", encoding="utf-8")
+    assert list(docgen.iter_watched_files([str(inputs)])) == [str(inputs / "a.xml"), str(inputs / "b.xml")]
+    
+    output = tmp_path / "output"
+    docgen.watch_proceedings([str(inputs)], str(output), interval=0, polls=2)
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("validation failed, see " + str(output / "a.md"))
+    assert "6 of 6 papers regenerated" in lines[1]
+    assert (output / "b.md").read_text(encoding="utf-8") == docgen.process_xml_data(corpus)
+    assert os.path.exists(output / "b" / "proceedings.tex")